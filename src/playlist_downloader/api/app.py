@@ -3,35 +3,71 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.staticfiles import StaticFiles
+from .middleware import CombinedEdgeMiddleware
 from .rate_limit import init_rate_limiter
+from .static import ImmutableStaticFiles
 
 from ..config import get_settings
-from ..core.paths import DOWNLOADS_DIR, LEGACY_STATIC_DIR, VITE_DIST_DIR
+from ..core.paths import ASSETS_DIR, DOWNLOADS_DIR
 from ..database import db
 from ..integrations.spotify_client import SpotifyClient
 from ..services.download_service import DownloadService
 from ..services.search_service import SearchManager
 
-def create_app() -> FastAPI:
-    settings = get_settings()
 
+def _sweep_downloads(root: Path, max_age: float) -> int:
+    """Delete files in ``root`` older than ``max_age`` seconds; returns the count removed."""
+
+    root.mkdir(parents=True, exist_ok=True)
+    now = datetime.now().timestamp()
+    removed_count = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if now - entry.stat(follow_symlinks=False).st_mtime > max_age:
+                os.unlink(entry.path)
+                removed_count += 1
+    return removed_count
+
+
+def _configure_logging() -> Optional[QueueListener]:
+    """Route root logging through a queue so handlers never write on the event loop.
+
+    Like ``logging.basicConfig`` this is a no-op when the root logger already has
+    handlers; in that case no listener is started and None is returned.
+    """
+
+    if logging.root.handlers:
+        return None
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = QueueListener(
+        log_queue,
+        logging.StreamHandler(),
+        logging.FileHandler("app.log", encoding="utf-8"),
+    )
     logging.basicConfig(
         level=logging.DEBUG,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler("app.log", encoding="utf-8")
-        ],
+        handlers=[QueueHandler(log_queue)],
     )
+    listener.start()
+    return listener
+
+
+def create_app() -> FastAPI:
+    settings = get_settings()
+
+    log_listener = _configure_logging()
     logger = logging.getLogger(__name__)
 
     # Ensure ffmpeg from spotdl is in PATH
@@ -42,26 +78,18 @@ def create_app() -> FastAPI:
     app = FastAPI(title="Playlist Downloader API - Container")
     init_rate_limiter(app)
 
-    # Security middleware
-    app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    # Security middleware (trusted host + CORS + gzip in a single ASGI hop)
     app.add_middleware(
-        CORSMiddleware,
+        CombinedEdgeMiddleware,
+        allowed_hosts=["*"],
         allow_origins=settings.CORS_ORIGINS,
         allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        minimum_size=1000,
     )
 
     # Assets mount (SPA serving)
-    assets_dir: Optional[Path] = None
-    if (VITE_DIST_DIR / "assets").exists():
-        assets_dir = VITE_DIST_DIR / "assets"
-    elif (LEGACY_STATIC_DIR / "assets").exists():
-        assets_dir = LEGACY_STATIC_DIR / "assets"
-
-    if assets_dir and assets_dir.exists():
-        app.mount("/assets", StaticFiles(directory=str(assets_dir)), name="assets")
+    if ASSETS_DIR is not None:
+        app.mount("/assets", ImmutableStaticFiles(directory=str(ASSETS_DIR), html=False), name="assets")
 
     # State/services
     spotify_client = SpotifyClient(client_id=settings.SPOTIFY_CLIENT_ID, client_secret=settings.SPOTIFY_CLIENT_SECRET)
@@ -82,6 +110,11 @@ def create_app() -> FastAPI:
 
     @app.on_event("startup")
     async def startup_event():
+        # asyncio's default (min(32, CPUs + 4)) is sized for CPU work, not threads parked on I/O.
+        pool_size = settings.IO_THREAD_POOL_SIZE or (os.cpu_count() or 1) * 5
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="pld-io")
+        )
         await db.init_db()
 
         # Option A (Render free): downloads run in-process.
@@ -96,16 +129,19 @@ def create_app() -> FastAPI:
 
         # Cleanup old downloads (24h)
         try:
-            DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
-            now = datetime.now().timestamp()
-            removed_count = 0
-            for f in DOWNLOADS_DIR.iterdir():
-                if f.is_file() and (now - f.stat().st_mtime > 86400):
-                    f.unlink()
-                    removed_count += 1
+            removed_count = await asyncio.to_thread(_sweep_downloads, DOWNLOADS_DIR, 86400)
             if removed_count > 0:
                 logger.info("Cleaned up %s old download files.", removed_count)
         except Exception as e:  # noqa: BLE001
             logger.error("File cleanup failed: %s", e)
 
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        app.state.download_service.close()
+        await app.state.search_manager.aclose()
+        await db.close()
+        if log_listener is not None:
+            # Drains queued records before the process exits.
+            log_listener.stop()
+
     return app
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_GZIP_WBITS = 31  # zlib wbits value that emits a gzip header/trailer
+
+
+class CombinedEdgeMiddleware:
+    """Pure ASGI replacement for the TrustedHost + GZip + CORS middleware stack.
+
+    One wrapper per request instead of three: host checking, CORS headers and
+    gzip compression are all applied on the same ``send`` hop.
+
+    Only single-message bodies are compressed. Streamed bodies (e.g. the large
+    zip/mp3 artifacts served from ``/api/download_file``) are passed through
+    as-is; they are already compressed and buffering them would be costly.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        allowed_hosts: Sequence[str] = ("*",),
+        allow_origins: Sequence[str] = ("*",),
+        allow_credentials: bool = True,
+        minimum_size: int = 1000,
+        compresslevel: int = 9,
+    ) -> None:
+        self.app = app
+        self.allowed_hosts = [h.lower() for h in allowed_hosts]
+        self.allow_all_hosts = "*" in self.allowed_hosts
+        self.allow_origins = list(allow_origins)
+        self.allow_all_origins = "*" in self.allow_origins
+        self.allow_credentials = allow_credentials
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+
+        if not self.allow_all_hosts and not self._is_allowed_host(headers.get("host", "")):
+            response = PlainTextResponse("Invalid host header", status_code=400)
+            await response(scope, receive, send)
+            return
+
+        origin = headers.get("origin")
+        if origin is not None and scope["method"] == "OPTIONS" and "access-control-request-method" in headers:
+            await self._preflight_response(origin, headers)(scope, receive, send)
+            return
+
+        cors_headers = self._cors_headers(origin)
+        gzip_ok = "gzip" in headers.get("accept-encoding", "")
+
+        if not cors_headers and not gzip_ok:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start: Optional[Message] = None
+
+        async def edge_send(message: Message) -> None:
+            nonlocal pending_start
+            message_type = message["type"]
+
+            if message_type == "http.response.start":
+                if cors_headers:
+                    response_headers = MutableHeaders(scope=message)
+                    for key, value in cors_headers:
+                        if key == "vary":
+                            response_headers.add_vary_header(value)
+                        else:
+                            response_headers[key] = value
+                if not gzip_ok or "content-encoding" in Headers(raw=message.get("headers", [])):
+                    await send(message)
+                    return
+                # Hold the start message until we know whether the body gets compressed.
+                pending_start = message
+                return
+
+            if pending_start is None:
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"") if message_type == "http.response.body" else b""
+            if message_type != "http.response.body" or message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, _GZIP_WBITS)
+            compressed = compressor.compress(body) + compressor.flush()
+            response_headers = MutableHeaders(scope=start)
+            response_headers["Content-Encoding"] = "gzip"
+            response_headers["Content-Length"] = str(len(compressed))
+            response_headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, edge_send)
+
+    def _is_allowed_host(self, host_header: str) -> bool:
+        host = host_header.split(":", 1)[0].lower()
+        for pattern in self.allowed_hosts:
+            if host == pattern or (pattern.startswith("*.") and host.endswith(pattern[1:])):
+                return True
+        return False
+
+    def _is_allowed_origin(self, origin: str) -> bool:
+        return self.allow_all_origins or origin in self.allow_origins
+
+    def _cors_headers(self, origin: Optional[str]) -> List[Tuple[str, str]]:
+        if origin is None:
+            return []
+
+        cors: List[Tuple[str, str]] = []
+        if self.allow_credentials:
+            cors.append(("access-control-allow-credentials", "true"))
+
+        # With credentials a wildcard is not honoured by browsers, so mirror the origin back.
+        if self.allow_all_origins and not self.allow_credentials:
+            cors.append(("access-control-allow-origin", "*"))
+        elif self._is_allowed_origin(origin):
+            cors.append(("access-control-allow-origin", origin))
+        cors.append(("vary", "Origin"))
+        return cors
+
+    def _preflight_response(self, origin: str, request_headers: Headers) -> PlainTextResponse:
+        headers = {
+            "Access-Control-Allow-Methods": "DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT",
+            "Access-Control-Max-Age": "600",
+            "Vary": "Origin",
+        }
+        if self.allow_credentials:
+            headers["Access-Control-Allow-Credentials"] = "true"
+
+        requested_headers = request_headers.get("access-control-request-headers")
+        if requested_headers is not None:
+            headers["Access-Control-Allow-Headers"] = requested_headers
+
+        if not self._is_allowed_origin(origin):
+            return PlainTextResponse("Disallowed CORS origin", status_code=400, headers=headers)
+
+        headers["Access-Control-Allow-Origin"] = origin if self.allow_credentials or not self.allow_all_origins else "*"
+        return PlainTextResponse("OK", status_code=200, headers=headers)
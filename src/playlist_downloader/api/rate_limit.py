@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, List
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from starlette.requests import Request
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+
+
+@lru_cache(maxsize=4096)
+def _parse_xff(raw: str) -> str:
+    # Proxy chains repeat across requests, so memoize the first-hop extraction.
+    return raw.split(",", 1)[0].strip()
+
 
 def _rate_limit_key(request: Request) -> str:
     # Prefer the per-device identifier used for tenant isolation.
@@ -15,17 +25,86 @@ def _rate_limit_key(request: Request) -> str:
     # Fall back to forwarded IP when behind a proxy (Render/Vercel).
     forwarded_for = request.headers.get("x-forwarded-for")
     if forwarded_for:
-        ip = forwarded_for.split(",")[0].strip()
+        ip = _parse_xff(forwarded_for)
         if ip:
             return f"ip:{ip}"
 
-    return f"ip:{get_remote_address(request)}"
+    return f"ip:{request.client.host if request.client else '127.0.0.1'}"
+
 
+class RateLimitExceeded(Exception):
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
 
-# Keep a single limiter instance to match legacy behavior.
-limiter = Limiter(key_func=_rate_limit_key)
+
+async def _rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    # Same 429 body the slowapi decorator used to send, so clients see no change.
+    return JSONResponse({"error": f"Rate limit exceeded: {exc.detail}"}, status_code=429)
 
 
 def init_rate_limiter(app: FastAPI) -> None:
-    app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+class BucketTimeRateLimit:
+    """Sliding-window limiter built from per-second hit counters.
+
+    Each key owns a ring of ``window_seconds`` counters; a hit clears the
+    buckets that expired since the key was last seen, then sums the ring.
+    Single event loop, so no locking is needed.
+    """
+
+    def __init__(self, limit: int, window_seconds: int = 60, max_keys: int = 10_000):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._zeros = array("I", [0]) * window_seconds
+        # key -> [bucket counters, last-seen second]
+        self._buckets: Dict[str, List] = {}
+
+    def hit(self, key: str) -> bool:
+        """Record a hit for ``key``; returns False if the limit is already reached."""
+
+        now = time.time_ns() // 1_000_000_000
+        window = self.window_seconds
+
+        entry = self._buckets.get(key)
+        if entry is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            entry = [array("I", self._zeros), now]
+            self._buckets[key] = entry
+
+        buckets, last = entry
+        elapsed = now - last
+        if elapsed >= window:
+            buckets[:] = self._zeros
+        elif elapsed > 0:
+            for sec in range(last + 1, now + 1):
+                buckets[sec % window] = 0
+        entry[1] = now
+
+        if sum(buckets) >= self.limit:
+            return False
+        buckets[now % window] += 1
+        return True
+
+    def _prune(self, now: int) -> None:
+        stale = [k for k, (_b, last) in self._buckets.items() if now - last >= self.window_seconds]
+        for k in stale:
+            del self._buckets[k]
+        if len(self._buckets) >= self.max_keys:
+            # Every key is active; drop the oldest half rather than grow without bound.
+            by_age = sorted(self._buckets, key=lambda k: self._buckets[k][1])
+            for k in by_age[: len(by_age) // 2]:
+                del self._buckets[k]
+
+
+# /api/prepare is the only rate-limited route (previously @limiter.limit("60/minute") via slowapi).
+prepare_limiter = BucketTimeRateLimit(limit=60, window_seconds=60)
+
+
+def enforce_prepare_rate_limit(request: Request) -> None:
+    if not prepare_limiter.hit(_rate_limit_key(request)):
+        raise RateLimitExceeded(f"{prepare_limiter.limit} per 1 minute")
@@ -1,48 +1,40 @@
 from __future__ import annotations
 
-import asyncio
-from typing import Any, Dict, List
+import json
+from typing import Any, Optional
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import Response
 
 from ..schemas import SearchRequest
-from ...services.search_service import build_suggestions, relevance_score
+from ...services.search_service import build_suggestions, rank_results
+
+try:  # optional: one native pass from dicts to bytes
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:  # pragma: no cover
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
 
 router = APIRouter(prefix="/api", tags=["search"])
 
 
+def _json(payload: Any) -> Response:
+    # Results are plain str/number/None dicts already; skip FastAPI's jsonable_encoder walk.
+    return Response(content=_dumps(payload), media_type="application/json")
+
+
 @router.get("/suggestions")
-async def get_suggestions(request: Request, q: str):
-    return build_suggestions(
-        query=q,
-        spotify_client=request.app.state.spotify_client,
-        search_manager=request.app.state.search_manager,
+async def get_suggestions(request: Request, q: str, x_device_id: Optional[str] = Header(None)):
+    return _json(
+        await build_suggestions(query=q, search_manager=request.app.state.search_manager, session_id=x_device_id)
     )
 
 
 @router.post("/search")
 async def search_media(request: Request, req: SearchRequest):
-    tasks = []
-    search_manager = request.app.state.search_manager
-
-    if "spotify" in req.providers:
-        tasks.append(search_manager.search_spotify(req.query))
-    if "youtube" in req.providers:
-        tasks.append(search_manager.search_youtube(req.query))
-    if "soundcloud" in req.providers:
-        tasks.append(search_manager.search_soundcloud(req.query))
-
-    results_list = await asyncio.gather(*tasks)
-
-    final_results: List[Dict[str, Any]] = []
-    for r in results_list:
-        final_results.extend(r)
-
-    final_results.sort(
-        key=lambda it: (
-            relevance_score(it, req.query),
-            (it.get("title", "") or "").strip().lower(),
-        ),
-        reverse=True,
-    )
-    return final_results
+    results = await request.app.state.search_manager.search_all(req.query, req.providers)
+    return _json(rank_results(results, req.query))
@@ -1,24 +1,56 @@
 from __future__ import annotations
 
+import os
+import time
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi.responses import HTMLResponse
 
 from ...core.paths import LEGACY_STATIC_DIR, VITE_DIST_DIR
 
 router = APIRouter(tags=["spa"])
 
+# index.html is tiny and only changes on redeploy/rebuild, so keep it in memory
+# and re-check the filesystem at most once per refresh interval.
+_INDEX_CANDIDATES = (VITE_DIST_DIR / "index.html", LEGACY_STATIC_DIR / "index.html")
+_INDEX_REFRESH_SECONDS = 60.0
+
+_index_body: Optional[bytes] = None
+_index_key: Optional[tuple[str, float]] = None
+_index_checked_at = float("-inf")
+
+
+def _load_index() -> Optional[bytes]:
+    global _index_body, _index_key, _index_checked_at
+
+    now = time.monotonic()
+    if now - _index_checked_at < _INDEX_REFRESH_SECONDS:
+        return _index_body
+    _index_checked_at = now
+
+    for candidate in _INDEX_CANDIDATES:
+        try:
+            key = (str(candidate), os.stat(candidate).st_mtime)
+            if _index_body is None or key != _index_key:
+                _index_body = candidate.read_bytes()
+                _index_key = key
+            return _index_body
+        except OSError:
+            continue
+
+    _index_body = None
+    _index_key = None
+    return None
+
 
 @router.get("/{full_path:path}")
 async def serve_spa(full_path: str):
     if full_path.startswith("api"):
         raise HTTPException(404, "API endpoint not found")
 
-    vite_index = VITE_DIST_DIR / "index.html"
-    if vite_index.exists():
-        return FileResponse(vite_index)
-
-    index_path = LEGACY_STATIC_DIR / "index.html"
-    if index_path.exists():
-        return FileResponse(index_path)
+    index_body = _load_index()
+    if index_body is not None:
+        return HTMLResponse(index_body)
 
     return {"message": "API Running (Frontend not built)"}
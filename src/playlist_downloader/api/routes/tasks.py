@@ -1,46 +1,93 @@
-from datetime import datetime
+import asyncio
+import os
+import secrets
+import shutil
+import time
 from pathlib import Path
 from typing import Optional
+from urllib.parse import quote
 
+import httpx
 from fastapi import APIRouter, BackgroundTasks, Body, Header, HTTPException, Request
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 
 from ..schemas import InitRequest, StartRequest
-from ..rate_limit import limiter
-from ...config import get_settings
+from ..rate_limit import enforce_prepare_rate_limit
+from ...config import Settings, get_settings
 from ...utils.download_tokens import create_download_token, verify_download_token
 
+# Optional diagnostics dependencies: resolved once at import, not per request.
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import yt_dlp
+    _YT_DLP_IMPORT_ERROR: Optional[str] = None
+except Exception as e:  # noqa: BLE001
+    yt_dlp = None
+    _YT_DLP_IMPORT_ERROR = str(e)
+
 router = APIRouter(prefix="/api", tags=["tasks"])
 
+_MEDIA_BY_SUFFIX: dict[str, str] = {
+    ".zip": "application/zip",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".flac": "audio/flac",
+}
+
+_SETTINGS: Settings
+_MAX_QUEUED: int
+_MAX_RUNNING: int
+_ALLOW_INPROCESS: bool
+_ACCEL_REDIRECT_PREFIX: str
+
+
+def reload_limits() -> None:
+    """Re-read settings-derived limits (e.g. after ``invalidate_settings_cache()``)."""
+
+    global _SETTINGS, _MAX_QUEUED, _MAX_RUNNING, _ALLOW_INPROCESS, _ACCEL_REDIRECT_PREFIX
+    _SETTINGS = get_settings()
+    _MAX_QUEUED = int(getattr(_SETTINGS, "MAX_QUEUED_TASKS_PER_OWNER", 2))
+    _MAX_RUNNING = int(getattr(_SETTINGS, "MAX_RUNNING_TASKS_PER_OWNER", 1))
+    _ALLOW_INPROCESS = bool(getattr(_SETTINGS, "ALLOW_INPROCESS_DOWNLOADS", True))
+    _ACCEL_REDIRECT_PREFIX = str(getattr(_SETTINGS, "DOWNLOADS_ACCEL_REDIRECT_PREFIX", "") or "")
+
+
+# Settings are process-wide; resolve the limits once instead of per request.
+reload_limits()
+
 
 @router.post("/prepare")
-@limiter.limit("60/minute")
 async def prepare_download(
     request: Request,
     background_tasks: BackgroundTasks,
     init_req: InitRequest = Body(...),
     x_device_id: Optional[str] = Header(None),
 ):
-    settings = get_settings()
+    enforce_prepare_rate_limit(request)
     if not x_device_id:
         raise HTTPException(status_code=400, detail="X-Device-ID header required")
 
     # Capacity controls: prevent one device from enqueueing unlimited work.
     queued_statuses = ["pending", "preparing", "queued", "ready"]
     running_statuses = ["downloading", "zipping"]
-    queued_count = await request.app.state.db.count_tasks_for_owner(owner_id=x_device_id, statuses=queued_statuses)
-    running_count = await request.app.state.db.count_tasks_for_owner(owner_id=x_device_id, statuses=running_statuses)
-    if queued_count >= int(getattr(settings, "MAX_QUEUED_TASKS_PER_OWNER", 2)):
+    queued_count, running_count = await request.app.state.db.count_tasks_grouped(
+        owner_id=x_device_id, groups=[queued_statuses, running_statuses]
+    )
+    if queued_count >= _MAX_QUEUED:
         raise HTTPException(status_code=429, detail="Too many queued downloads for this device")
-    if running_count >= int(getattr(settings, "MAX_RUNNING_TASKS_PER_OWNER", 1)) and queued_count >= int(
-        getattr(settings, "MAX_QUEUED_TASKS_PER_OWNER", 2)
-    ):
+    if running_count >= _MAX_RUNNING and queued_count >= _MAX_QUEUED:
         raise HTTPException(status_code=429, detail="Too many active downloads for this device")
 
-    tid = str(int(datetime.now().timestamp() * 1000))
+    # Millisecond timestamp keeps IDs roughly sortable; the random suffix avoids
+    # primary-key collisions when two prepares land in the same millisecond.
+    tid = f"{time.time_ns() // 1_000_000}-{secrets.token_hex(2)}"
     await request.app.state.db.create_task(tid, init_req.url, init_req.options, owner_id=x_device_id)
 
-    if not request.app.state.download_service or not bool(getattr(settings, "ALLOW_INPROCESS_DOWNLOADS", True)):
+    if not request.app.state.download_service or not _ALLOW_INPROCESS:
         raise HTTPException(status_code=503, detail="Download service unavailable")
 
     background_tasks.add_task(request.app.state.download_service.fetch_playlist_info, tid, init_req.url)
@@ -56,19 +103,18 @@ async def start_download(
     x_device_id: Optional[str] = Header(None),
     body: Optional[StartRequest] = None,
 ):
-    settings = get_settings()
     if not x_device_id:
         raise HTTPException(status_code=400, detail="X-Device-ID header required")
 
     # Capacity controls: only allow N concurrent running tasks per device.
     running_statuses = ["downloading", "zipping"]
-    running_count = await req.app.state.db.count_tasks_for_owner(owner_id=x_device_id, statuses=running_statuses)
-    if running_count >= int(getattr(settings, "MAX_RUNNING_TASKS_PER_OWNER", 1)):
-        raise HTTPException(status_code=429, detail="Another download is already running for this device")
-
-    task = await req.app.state.db.get_task_for_owner(task_id, x_device_id)
+    task, running_count = await req.app.state.db.get_task_for_owner_with_count(
+        task_id, x_device_id, statuses=running_statuses
+    )
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    if running_count >= _MAX_RUNNING:
+        raise HTTPException(status_code=429, detail="Another download is already running for this device")
 
     # Persist user's track selection
     if body and body.selected_indices is not None:
@@ -76,7 +122,7 @@ async def start_download(
         task["options"]["selected_indices"] = body.selected_indices
         await req.app.state.db.save_full_task_state(task_id, task)
 
-    if not req.app.state.download_service or not bool(getattr(settings, "ALLOW_INPROCESS_DOWNLOADS", True)):
+    if not req.app.state.download_service or not _ALLOW_INPROCESS:
         raise HTTPException(status_code=503, detail="Download service unavailable")
 
     background_tasks.add_task(req.app.state.download_service.process_download, task_id)
@@ -85,11 +131,22 @@ async def start_download(
 
 
 @router.get("/tasks")
-async def get_tasks(request: Request, x_device_id: Optional[str] = Header(None)):
+async def get_tasks(request: Request, response: Response, x_device_id: Optional[str] = Header(None)):
     if not x_device_id:
         raise HTTPException(status_code=400, detail="X-Device-ID header required")
-    tasks = await request.app.state.db.get_all_tasks(owner_id=x_device_id)
-    return list(tasks.values())
+
+    # Pollers revalidate with If-None-Match; while no task has changed the
+    # answer is a 304 without touching the database.
+    db = request.app.state.db
+    version = db.tasks_version()
+    if version is not None:
+        etag = f'W/"tasks-{version}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "X-Device-ID"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
+        response.headers.update(cache_headers)
+
+    return await db.list_tasks_for_owner(owner_id=x_device_id)
 
 
 @router.delete("/delete/{task_id}")
@@ -123,8 +180,7 @@ async def download_file(
     # a short-lived signed token in the query string.
     owner_id: Optional[str] = None
     if token:
-        settings = get_settings()
-        payload = verify_download_token(token=token, secret=settings.SECRET_KEY)
+        payload = verify_download_token(token=token, secret=_SETTINGS.SECRET_KEY)
         if not payload or payload.get("task_id") != task_id:
             raise HTTPException(status_code=404, detail="File not ready")
         owner_id = payload.get("owner_id")
@@ -136,30 +192,39 @@ async def download_file(
     if not owner_id:
         raise HTTPException(status_code=404, detail="File not ready")
 
-    # Verify DB ownership strictly.
-    task_owner = await request.app.state.db.get_task_owner_id(task_id)
-    if not task_owner or task_owner != owner_id:
+    # Verify DB ownership strictly (owner and artifact path come from one query).
+    owner_and_zip = await request.app.state.db.get_task_owner_and_zip(task_id)
+    if not owner_and_zip:
         raise HTTPException(status_code=404, detail="File not ready")
-
-    task = await request.app.state.db.get_task(task_id)
-    if not task or not task.get("zip_path"):
+    task_owner, zip_path = owner_and_zip
+    if not task_owner or task_owner != owner_id or not zip_path:
         raise HTTPException(status_code=404, detail="File not ready")
 
-    file_path = Path(task["zip_path"])
-    if not file_path.exists():
+    file_path = Path(zip_path)
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="File expired or missing")
 
-    media_type = "application/octet-stream"
-    if file_path.suffix == ".zip":
-        media_type = "application/zip"
-    elif file_path.suffix == ".mp3":
-        media_type = "audio/mpeg"
-    elif file_path.suffix == ".m4a":
-        media_type = "audio/mp4"
-    elif file_path.suffix == ".flac":
-        media_type = "audio/flac"
+    media_type = _MEDIA_BY_SUFFIX.get(file_path.suffix, "application/octet-stream")
+
+    if _ACCEL_REDIRECT_PREFIX:
+        # nginx streams the file with sendfile(2); we only send headers.
+        quoted_name = quote(file_path.name)
+        if quoted_name != file_path.name:
+            disposition = f"attachment; filename*=utf-8''{quoted_name}"
+        else:
+            disposition = f'attachment; filename="{file_path.name}"'
+        return Response(
+            media_type=media_type,
+            headers={
+                "Content-Disposition": disposition,
+                "X-Accel-Redirect": f"{_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quoted_name}",
+            },
+        )
 
-    return FileResponse(file_path, filename=file_path.name, media_type=media_type)
+    # Pass the stat we already have so FileResponse does not stat the file again.
+    return FileResponse(file_path, filename=file_path.name, media_type=media_type, stat_result=stat_result)
 
 
 @router.get("/download_token/{task_id}")
@@ -171,8 +236,7 @@ async def download_token(request: Request, task_id: str, x_device_id: Optional[s
     if not task or not task.get("zip_path"):
         raise HTTPException(status_code=404, detail="File not ready")
 
-    settings = get_settings()
-    token = create_download_token(task_id=task_id, owner_id=x_device_id, secret=settings.SECRET_KEY, ttl_seconds=600)
+    token = create_download_token(task_id=task_id, owner_id=x_device_id, secret=_SETTINGS.SECRET_KEY, ttl_seconds=600)
     return {"token": token}
 
 
@@ -183,62 +247,80 @@ async def get_history(request: Request, x_device_id: Optional[str] = Header(None
     return await request.app.state.db.get_recent_tasks(limit=10, owner_id=x_device_id)
 
 
-@router.get("/health/diagnose")
-async def diagnose_health(request: Request):
-    """Run self-check diagnostics for debugging crashes/issues."""
-    import shutil
-    import subprocess
-    import sys
-    import importlib
-    
-    results = {
-        "status": "ok",
-        "checks": {}
-    }
-    
-    # 1. yt-dlp check
-    try:
-        import yt_dlp
+_STATUS_SEVERITY = {"ok": 0, "warning": 1, "error": 2}
 
-        yt_dlp_version = getattr(yt_dlp, "__version__", None) or "unknown"
-        results["checks"]["yt_dlp"] = {"status": "ok", "version": yt_dlp_version}
-    except Exception as e:
-        results["checks"]["yt_dlp"] = {"status": "error", "error": str(e)}
-        results["status"] = "warning"
 
-    # 2. ffmpeg check
-    ffmpeg_path = shutil.which("ffmpeg")
+async def _check_yt_dlp() -> tuple[str, dict]:
+    if yt_dlp is None:
+        return "warning", {"status": "error", "error": _YT_DLP_IMPORT_ERROR}
+    yt_dlp_version = getattr(yt_dlp, "__version__", None) or "unknown"
+    return "ok", {"status": "ok", "version": yt_dlp_version}
+
+
+async def _check_ffmpeg() -> tuple[str, dict]:
+    ffmpeg_path = await asyncio.to_thread(shutil.which, "ffmpeg")
     if ffmpeg_path:
-        results["checks"]["ffmpeg"] = {"status": "ok", "path": ffmpeg_path}
-    else:
-        results["checks"]["ffmpeg"] = {"status": "error", "error": "ffmpeg not found in PATH"}
-        results["status"] = "error"
+        return "ok", {"status": "ok", "path": ffmpeg_path}
+    return "error", {"status": "error", "error": "ffmpeg not found in PATH"}
 
-    # 3. Connectivity (Ping YouTube)
+
+async def _check_connectivity() -> tuple[str, dict]:
+    # Ping YouTube
     try:
-        import requests
-        resp = requests.head("https://www.youtube.com", timeout=5)
-        results["checks"]["connectivity"] = {"status": "ok", "code": resp.status_code}
+        async with httpx.AsyncClient() as client:
+            resp = await client.head("https://www.youtube.com", timeout=5.0)
+        return "ok", {"status": "ok", "code": resp.status_code}
     except Exception as e:
-        results["checks"]["connectivity"] = {"status": "error", "error": str(e)}
-        results["status"] = "error"
+        return "error", {"status": "error", "error": str(e)}
 
-    # 4. Memory (RSS)
-    try:
-        psutil = importlib.import_module("psutil")
-        process = psutil.Process()  # type: ignore[attr-defined]
-        mem_info = process.memory_info()
-        rss_mb = mem_info.rss / 1024 / 1024
-        results["checks"]["memory"] = {"status": "ok", "rss_mb": round(rss_mb, 2)}
-    except ModuleNotFoundError:
-        results["checks"]["memory"] = {"status": "skipped", "error": "psutil not installed"}
-
-    # 5. Environment Config
-    settings = request.app.state.settings
-    results["checks"]["config"] = {
+
+async def _check_memory() -> tuple[str, dict]:
+    if psutil is None:
+        return "ok", {"status": "skipped", "error": "psutil not installed"}
+
+    def rss_mb() -> float:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+
+    return "ok", {"status": "ok", "rss_mb": round(await asyncio.to_thread(rss_mb), 2)}
+
+
+async def _check_config(settings) -> tuple[str, dict]:
+    return "ok", {
         "YTDLP_MAX_WORKERS": getattr(settings, "YTDLP_MAX_WORKERS", "unset"),
         "YTDLP_COOKIES_BROWSER": getattr(settings, "YTDLP_COOKIES_BROWSER", "unset"),
         "YTDLP_PROXY": "configured" if getattr(settings, "YTDLP_PROXY", "") else "none"
     }
 
+
+@router.get("/health/diagnose")
+async def diagnose_health(request: Request):
+    """Run self-check diagnostics for debugging crashes/issues.
+
+    Checks are independent, so they run concurrently; total latency is bounded
+    by the slowest one (usually the connectivity probe).
+    """
+    results = {
+        "status": "ok",
+        "checks": {}
+    }
+
+    names = ["yt_dlp", "ffmpeg", "connectivity", "memory", "config"]
+    outcomes = await asyncio.gather(
+        _check_yt_dlp(),
+        _check_ffmpeg(),
+        _check_connectivity(),
+        _check_memory(),
+        _check_config(request.app.state.settings),
+        return_exceptions=True,
+    )
+
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, BaseException):
+            status, payload = "error", {"status": "error", "error": str(outcome)}
+        else:
+            status, payload = outcome
+        results["checks"][name] = payload
+        if _STATUS_SEVERITY[status] > _STATUS_SEVERITY[results["status"]]:
+            results["status"] = status
+
     return results
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+import stat
+from mimetypes import guess_type
+from typing import Dict
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Scope
+
+# Sidecar files produced at build time (see Dockerfile), in preference order.
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _accepted_codings(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as coding -> q (``gzip;q=0`` means "not gzip", not "gzip")."""
+    codings: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding] = q
+    return codings
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for Vite's content-hashed ``/assets`` bundle.
+
+    Hashed filenames never change content, so responses are marked immutable.
+    When the client accepts it and a ``.br``/``.gz`` sidecar exists, the
+    sidecar is served directly instead of compressing on the fly.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)  # its 405
+        accepted = _accepted_codings(Headers(scope=scope).get("accept-encoding", ""))
+        wildcard_q = accepted.get("*", 0.0)
+        for encoding, suffix in _PRECOMPRESSED:
+            if accepted.get(encoding, wildcard_q) <= 0:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            response = self.file_response(full_path, stat_result, scope)
+            if response.status_code == 200:
+                response.headers["content-encoding"] = encoding
+                media_type = guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/"):
+                    media_type += "; charset=utf-8"
+                response.headers["content-type"] = media_type
+            return response
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        response.headers["vary"] = "Accept-Encoding"
+        return response
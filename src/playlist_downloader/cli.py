@@ -2,13 +2,13 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
 from .config import Settings, settings
 from .downloader import download_playlist
-from .providers import ShopifyPlaylistClient, SoundCloudPlaylistClient
+from .providers import ShopifyPlaylistClient, SoundCloudPlaylistClient, fetch_playlists
 
 app = typer.Typer(help="Download full playlists from Shopify metaobjects or SoundCloud public links.")
 logger = logging.getLogger(__name__)
@@ -23,30 +23,39 @@ class Provider(str):
 
 @app.command()
 def download(
-    playlist_url: str = typer.Argument(..., help="Share URL for the playlist"),
+    playlist_urls: List[str] = typer.Argument(..., help="Share URL(s) for one or more playlists"),
     provider: Provider = typer.Option(Provider.AUTO, case_sensitive=False),
     output: Optional[Path] = typer.Option(None, "--output", "-o", help="Destination directory"),
     shopify_store: Optional[str] = typer.Option(None, help="Override Shopify store domain"),
     shopify_token: Optional[str] = typer.Option(None, help="Override Shopify private app access token"),
     soundcloud_client_id: Optional[str] = typer.Option(None, help="Override SoundCloud client id"),
     soundcloud_client_secret: Optional[str] = typer.Option(None, help="Override SoundCloud client secret"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore cached tokens and stream URLs"),
 ) -> None:
-    """Download every track from a playlist URL."""
-
-    resolved_provider = _detect_provider(provider, playlist_url)
-    logger.info("Using provider %s", resolved_provider)
-    playlist = _fetch_playlist(
-        resolved_provider,
-        playlist_url,
-        settings,
-        shopify_store,
-        shopify_token,
-        soundcloud_client_id,
-        soundcloud_client_secret,
-    )
+    """Download every track from one or more playlist URLs."""
+
+    resolved_providers = {url: _detect_provider(provider, url) for url in playlist_urls}
+
+    def fetch(playlist_url: str):
+        resolved_provider = resolved_providers[playlist_url]
+        logger.info("Using provider %s for %s", resolved_provider, playlist_url)
+        return _fetch_playlist(
+            resolved_provider,
+            playlist_url,
+            settings,
+            shopify_store,
+            shopify_token,
+            soundcloud_client_id,
+            soundcloud_client_secret,
+            use_cache=not no_cache,
+        )
+
+    # Metadata for every playlist is fetched up front and in parallel; tracks then download per playlist.
+    playlists = fetch_playlists(fetch, playlist_urls)
     destination = output or settings.ensure_download_dir()
-    target_dir = download_playlist(playlist, destination)
-    typer.echo(f"Downloaded {playlist.track_count} tracks to {target_dir}")
+    for playlist in playlists:
+        target_dir = download_playlist(playlist, destination)
+        typer.echo(f"Downloaded {playlist.track_count} tracks to {target_dir}")
 
 
 def _detect_provider(provider: Provider, playlist_url: str) -> Provider:
@@ -68,12 +77,15 @@ def _fetch_playlist(
     shopify_token: Optional[str],
     sc_client_id: Optional[str],
     sc_client_secret: Optional[str],
+    use_cache: bool = True,
 ):
     if provider == Provider.SHOPIFY:
         client = ShopifyPlaylistClient(store_domain=shopify_store, access_token=shopify_token)
         return client.fetch_playlist(playlist_url)
     if provider == Provider.SOUNDCLOUD:
-        client = SoundCloudPlaylistClient(client_id=sc_client_id, client_secret=sc_client_secret)
+        client = SoundCloudPlaylistClient(
+            client_id=sc_client_id, client_secret=sc_client_secret, use_cache=use_cache
+        )
         return client.fetch_playlist(playlist_url)
     raise typer.BadParameter(f"Unsupported provider {provider}")
 
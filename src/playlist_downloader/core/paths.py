@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Optional
 
 # NOTE: This file lives at: src/playlist_downloader/core/paths.py
 # parents[0]=core, [1]=playlist_downloader, [2]=src, [3]=project root
@@ -9,3 +10,14 @@ PROJECT_ROOT = Path(__file__).resolve().parents[3]
 VITE_DIST_DIR = PROJECT_ROOT / "web" / "dist"
 LEGACY_STATIC_DIR = PROJECT_ROOT / "static"
 DOWNLOADS_DIR = LEGACY_STATIC_DIR / "downloads"
+
+
+def _find_assets_dir() -> Optional[Path]:
+    for candidate in (VITE_DIST_DIR / "assets", LEGACY_STATIC_DIR / "assets"):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+# Built assets only change on redeploy, so probe once per process.
+ASSETS_DIR: Optional[Path] = _find_assets_dir()
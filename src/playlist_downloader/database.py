@@ -1,27 +1,57 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import String, Integer, Float, JSON, Text, Boolean, DateTime
+from sqlalchemy import String, Integer, Float, JSON, Text, Boolean, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
+import asyncio
+import copy
+import secrets
 import logging
+from functools import lru_cache
 import json
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 from sqlalchemy import inspect, text
 from sqlalchemy import func
+from sqlalchemy import event
+import socket
 from .config import get_settings
 
+try:  # optional: faster (de)serialization of the JSON columns
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# save_full_task_state() coalescing: progress ticks are buffered per task and
+# written in one upsert every interval (or once enough tasks are pending).
+_FLUSH_INTERVAL_SECONDS = 0.2
+_FLUSH_MAX_PENDING = 100
+# Statuses the UI waits on; these are written through immediately.
+_FLUSH_NOW_STATUSES = frozenset({"ready", "completed", "error", "cancelled"})
+
 
 def _to_iso_z(dt: datetime) -> str:
     # The DB stores naive UTC datetimes; serialize with an explicit UTC designator
     # so browsers don't treat the string as local time.
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    else:
-        dt = dt.astimezone(timezone.utc)
-    return dt.isoformat().replace("+00:00", "Z")
+    # Formatting the naive value and appending "Z" avoids a tz-aware copy and a
+    # string replace per timestamp (3 per row on list endpoints).
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat() + "Z"
+
+# JSONB on Postgres (parsed binary storage, GIN-indexable); plain JSON elsewhere (SQLite).
+_JSONType = JSON().with_variant(JSONB(), "postgresql")
+_JSON_COLUMNS = ("playlist_info", "options")
+
+
+def _pg_merge_sql(column: str, patch_sql: str, jsonb: bool) -> str:
+    """``column || patch`` on Postgres; a column still typed json is merged as jsonb and stored back as json."""
+    if jsonb:
+        return f"COALESCE({column}, '{{}}'::jsonb) || {patch_sql}"
+    return f"(COALESCE({column}::jsonb, '{{}}'::jsonb) || {patch_sql})::json"
 
 # --- Models ---
 class Base(DeclarativeBase):
@@ -29,6 +59,12 @@ class Base(DeclarativeBase):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Owner-scoped list/history/count queries: filter + ORDER BY created_at DESC
+        # + LIMIT are served by one index range scan (no sort).
+        Index("ix_tasks_owner_status_created", "owner_id", "status", text("created_at DESC")),
+        Index("ix_tasks_owner_created", "owner_id", text("created_at DESC")),
+    )
     
     id: Mapped[str] = mapped_column(String, primary_key=True)
     status: Mapped[str] = mapped_column(String, default="pending")
@@ -41,11 +77,11 @@ class Task(Base):
     status_updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Owner ID for Device Isolation
-    owner_id: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
     # JSON Blobs for complex structures (Playlist info, options)
-    playlist_info: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
-    options: Mapped[Optional[Dict]] = mapped_column(JSON, nullable=True)
+    playlist_info: Mapped[Optional[Dict]] = mapped_column(_JSONType, nullable=True)
+    options: Mapped[Optional[Dict]] = mapped_column(_JSONType, nullable=True)
 
     # Path to the generated ZIP artifact.
     # Historical note: the underlying DB column is named "s3_key" from an earlier
@@ -57,61 +93,149 @@ class Task(Base):
     # but strictly typed columns for status/progress queries.
 
 
+def _task_to_dict(t: Task) -> Dict[str, Any]:
+    playlist_info = t.playlist_info or {}
+    return {
+        "id": t.id,
+        "owner_id": t.owner_id,
+        "status": t.status,
+        "progress": t.progress,
+        "message": t.message,
+        "created_at": _to_iso_z(t.created_at),
+        "updated_at": _to_iso_z(t.updated_at or t.created_at),
+        "status_updated_at": _to_iso_z(t.status_updated_at or t.created_at),
+        "playlist": playlist_info,
+        "options": t.options,
+        "zip_path": t.zip_path,
+        # Convenience fields for UI
+        "title": playlist_info.get("title") or playlist_info.get("url") or "",
+        "provider": playlist_info.get("provider") or "",
+        "thumbnail": playlist_info.get("thumbnail") or playlist_info.get("cover_url"),
+        "track_count": playlist_info.get("track_count")
+    }
+
+
+def _set_tcp_nodelay(dbapi_connection, _connection_record) -> None:
+    # asyncpg already sets TCP_NODELAY on TCP sockets; enforce it so small status
+    # updates are never held back by Nagle/delayed-ACK interaction.
+    try:
+        transport = dbapi_connection._connection._transport
+        sock = transport.get_extra_info("socket") if transport is not None else None
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except Exception as e:  # noqa: BLE001
+        logger.debug("Could not set TCP_NODELAY: %s", e)
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+@lru_cache(maxsize=8)
+def _compute_engine_config(url: str, direct_tls: bool = False) -> tuple[str, Dict[str, Any], Dict[str, Any]]:
+    """Normalizes DATABASE_URL into (url, connect_args, engine_kwargs); parsed once per URL."""
+    if url and url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif url and url.startswith("postgresql://") and "asyncpg" not in url:
+        url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    connect_args: dict[str, Any] = {}
+
+    # Managed Postgres providers (including Render) may require SSL.
+    # They often append `?sslmode=require`, but not always.
+    # asyncpg does not support `sslmode` in the DSN query string; it expects an `ssl` kwarg.
+    # We strip ssl/sslmode query params and set connect_args["ssl"] when appropriate.
+    if url and url.startswith("postgresql+"):
+        parsed = urlparse(url)
+        query_items = dict(parse_qsl(parsed.query, keep_blank_values=True))
+
+        sslmode = (query_items.pop("sslmode", "") or "").lower()
+        ssl_flag = (query_items.pop("ssl", "") or "").lower()
+
+        hostname = (parsed.hostname or "").lower()
+        is_render_host = (hostname.endswith("render.com") or hostname.endswith("render.com."))
+
+        enable_ssl = False
+        if sslmode:
+            enable_ssl = sslmode != "disable"
+        elif ssl_flag:
+            enable_ssl = ssl_flag in {"1", "true", "yes", "require", "required"}
+        elif is_render_host:
+            enable_ssl = True
+
+        if enable_ssl:
+            connect_args["ssl"] = True
+            if direct_tls and "asyncpg" in url:
+                # Skips the SSLRequest/response exchange before the TLS handshake.
+                connect_args["direct_tls"] = True
+
+        rebuilt_query = urlencode(query_items)
+        url = urlunparse(parsed._replace(query=rebuilt_query))
+
+    engine_kwargs: dict[str, Any] = {
+        "echo": False,
+    }
+    if orjson is not None:
+        engine_kwargs["json_serializer"] = _orjson_dumps
+        engine_kwargs["json_deserializer"] = orjson.loads
+
+    # SQLite (aiosqlite) does not support the same pooling knobs as Postgres.
+    # Render Free Tier often limits connections (e.g. 20-50), so keep pool limits conservative.
+    if url.startswith("postgresql+"):
+        engine_kwargs.update({
+            "pool_size": 5,
+            "max_overflow": 10,
+            # Managed Postgres drops idle connections; check/recycle rather than fail a request.
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        })
+        if "asyncpg" in url:
+            # Reuse prepared statements for the hot task queries instead of
+            # re-parsing/planning them on every execute. JIT only adds latency
+            # to these tiny OLTP statements.
+            connect_args.update({
+                "statement_cache_size": 512,
+                "prepared_statement_cache_size": 512,
+                "server_settings": {"application_name": "playlist_dl", "jit": "off"},
+            })
+
+    return url, connect_args, engine_kwargs
+
 
 # --- Database Manager ---
 class DatabaseManager:
     def __init__(self):
-        # Render Free Tier often limits connections (e.g. 20-50).
-        # We set conservative pool limits to be safe.
-        
-        url = settings.DATABASE_URL
-        if url and url.startswith("postgres://"):
-            url = url.replace("postgres://", "postgresql+asyncpg://", 1)
-        elif url and url.startswith("postgresql://") and "asyncpg" not in url:
-             url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
-
-        connect_args: dict[str, Any] = {}
-
-        # Managed Postgres providers (including Render) may require SSL.
-        # They often append `?sslmode=require`, but not always.
-        # asyncpg does not support `sslmode` in the DSN query string; it expects an `ssl` kwarg.
-        # We strip ssl/sslmode query params and set connect_args["ssl"] when appropriate.
-        if url and url.startswith("postgresql+"):
-            parsed = urlparse(url)
-            query_items = dict(parse_qsl(parsed.query, keep_blank_values=True))
-
-            sslmode = (query_items.pop("sslmode", "") or "").lower()
-            ssl_flag = (query_items.pop("ssl", "") or "").lower()
-
-            hostname = (parsed.hostname or "").lower()
-            is_render_host = (hostname.endswith("render.com") or hostname.endswith("render.com."))
-
-            enable_ssl = False
-            if sslmode:
-                enable_ssl = sslmode != "disable"
-            elif ssl_flag:
-                enable_ssl = ssl_flag in {"1", "true", "yes", "require", "required"}
-            elif is_render_host:
-                enable_ssl = True
-
-            if enable_ssl:
-                connect_args["ssl"] = True
-
-            rebuilt_query = urlencode(query_items)
-            url = urlunparse(parsed._replace(query=rebuilt_query))
-
-        engine_kwargs = {
-            "echo": False,
-        }
-
-        # SQLite (aiosqlite) does not support the same pooling knobs as Postgres.
-        if url.startswith("postgresql+"):
-            engine_kwargs.update({"pool_size": 5, "max_overflow": 10})
-
-        self.engine = create_async_engine(url, connect_args=connect_args, **engine_kwargs)
+        url, connect_args, engine_kwargs = _compute_engine_config(
+            settings.DATABASE_URL, getattr(settings, "DATABASE_DIRECT_TLS", False)
+        )
+        # Pass a copy so the cached config can't be mutated through the engine.
+        self.engine = create_async_engine(url, connect_args=copy.deepcopy(connect_args), **engine_kwargs)
+        if "asyncpg" in url:
+            event.listen(self.engine.sync_engine, "connect", _set_tcp_nodelay)
         self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
 
+        # Buffered task-state rows keyed by task id (last write wins).
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flusher_task: Optional[asyncio.Task] = None
+        # Last status written per active task; only same-status updates are buffered.
+        self._last_status: Dict[str, str] = {}
+
+        # Change feed for conditional task-list polling: bumped on every task write.
+        # Only trustworthy when all writers are visible to this process: always for
+        # the local SQLite file, and on Postgres once the LISTEN connection is up.
+        self._tasks_epoch = secrets.token_hex(4)
+        self._tasks_version = 0
+        self._tasks_version_trusted = self.engine.dialect.name != "postgresql"
+        self._listen_conn: Any = None
+        # Postgres columns actually typed jsonb; re-read by init_db, since converting old json ones can fail.
+        self._jsonb_columns = frozenset(_JSON_COLUMNS if self.engine.dialect.name == "postgresql" else ())
+
     async def init_db(self):
+        is_postgres = self.engine.dialect.name == "postgresql"
+        json_ddl = "JSONB" if is_postgres else "JSON"
+
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
@@ -134,8 +258,8 @@ class DatabaseManager:
                     ("created_at", "TIMESTAMP", None),
                     ("updated_at", "TIMESTAMP", "UPDATE tasks SET updated_at = created_at WHERE updated_at IS NULL"),
                     ("status_updated_at", "TIMESTAMP", "UPDATE tasks SET status_updated_at = created_at WHERE status_updated_at IS NULL"),
-                    ("playlist_info", "JSON", None),
-                    ("options", "JSON", None),
+                    ("playlist_info", json_ddl, None),
+                    ("options", json_ddl, None),
                     ("s3_key", "VARCHAR", None),
                 ]
 
@@ -161,26 +285,224 @@ class DatabaseManager:
                         except Exception:
                             pass
 
-                # Ensure index for owner_id for performance/tenant isolation.
-                try:
-                    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_owner_id ON tasks (owner_id)"))
-                except Exception:
-                    pass
+                # Ensure owner-scoped indexes for performance/tenant isolation.
+                # The composites lead with owner_id, so the old single-column index is redundant.
+                for index_sql in (
+                    "CREATE INDEX IF NOT EXISTS ix_tasks_owner_status_created ON tasks (owner_id, status, created_at DESC)",
+                    "CREATE INDEX IF NOT EXISTS ix_tasks_owner_created ON tasks (owner_id, created_at DESC)",
+                    "DROP INDEX IF EXISTS ix_tasks_owner_id",
+                ):
+                    try:
+                        await conn.execute(text(index_sql))
+                    except Exception:
+                        pass
+
+                if is_postgres:
+                    # Older deployments created these as text-backed JSON columns.
+                    for col_name, data_type in (await self._pg_json_column_types(conn)).items():
+                        if data_type != "json":
+                            continue
+                        try:
+                            # Savepoint: a failed cast (e.g. a stored \u0000) must not abort the
+                            # surrounding migration transaction; the column just stays json.
+                            async with conn.begin_nested():
+                                await conn.execute(text(
+                                    f"ALTER TABLE tasks ALTER COLUMN {col_name} TYPE JSONB USING {col_name}::jsonb"
+                                ))
+                            logger.info("Schema Update: Converted tasks.%s to JSONB", col_name)
+                        except Exception as e:
+                            logger.error("Schema Update Failed converting %s to JSONB: %s", col_name, e)
             else:
                 # Table was likely just created; nothing to migrate.
                 logger.info("Schema Update: tasks table created fresh")
-            
+
+        if is_postgres:
+            # CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction block.
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                types = await self._pg_json_column_types(conn)
+                self._jsonb_columns = frozenset(col for col, data_type in types.items() if data_type == "jsonb")
+                # Nothing queries these columns by containment, and playlist_info is rewritten on
+                # every progress flush; GIN indexes on them were pure write cost.
+                for index_sql in (
+                    "DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_options_gin",
+                    "DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_playlist_info_gin",
+                ):
+                    try:
+                        await conn.execute(text(index_sql))
+                    except Exception as e:
+                        logger.error("Schema Update Failed dropping GIN index: %s", e)
+
         logger.info("PostgreSQL Tables initialized.")
 
+        if is_postgres:
+            await self._start_change_listener()
+
+        if self._flusher_task is None:
+            self._flusher_task = asyncio.create_task(self._flusher())
+
+    @staticmethod
+    async def _pg_json_column_types(conn) -> Dict[str, str]:
+        rows = await conn.execute(
+            text(
+                "SELECT column_name, data_type FROM information_schema.columns "
+                "WHERE table_name = 'tasks' AND column_name IN ('playlist_info', 'options')"
+            )
+        )
+        return {name: data_type for name, data_type in rows}
+
+    def tasks_version(self) -> Optional[str]:
+        """Opaque token that changes whenever any task row changes; None if unknown."""
+        if not self._tasks_version_trusted:
+            return None
+        return f"{self._tasks_epoch}-{self._tasks_version}"
+
+    def _bump_tasks_version(self, *_args: Any) -> None:
+        self._tasks_version += 1
+
+    async def _start_change_listener(self):
+        """LISTENs for the tasks trigger's NOTIFY so writes from other instances are seen too."""
+        async with self.engine.begin() as conn:
+            try:
+                await conn.execute(text(
+                    "CREATE OR REPLACE FUNCTION notify_task_update() RETURNS trigger AS $$ "
+                    "BEGIN PERFORM pg_notify('task_update', ''); RETURN NULL; END; "
+                    "$$ LANGUAGE plpgsql"
+                ))
+                await conn.execute(text("DROP TRIGGER IF EXISTS tasks_notify_update ON tasks"))
+                await conn.execute(text(
+                    "CREATE TRIGGER tasks_notify_update AFTER INSERT OR UPDATE OR DELETE ON tasks "
+                    "FOR EACH STATEMENT EXECUTE FUNCTION notify_task_update()"
+                ))
+            except Exception as e:
+                logger.error("Schema Update Failed creating task NOTIFY trigger: %s", e)
+                return
+
+        try:
+            self._listen_conn = await self.engine.connect()
+            raw = await self._listen_conn.get_raw_connection()
+            driver_conn = raw.driver_connection
+            await driver_conn.add_listener("task_update", self._bump_tasks_version)
+            driver_conn.add_termination_listener(self._on_listener_lost)
+            self._tasks_version_trusted = True
+        except Exception as e:  # noqa: BLE001
+            logger.error("Task change listener unavailable; task list polling stays uncached: %s", e)
+            if self._listen_conn is not None:
+                await self._listen_conn.close()
+                self._listen_conn = None
+
+    def _on_listener_lost(self, *_args: Any) -> None:
+        logger.warning("Task change listener connection lost; task list polling stays uncached")
+        self._tasks_version_trusted = False
+
+    async def close(self):
+        """Stops the write-behind flusher, drains pending writes and disposes the engine."""
+        if self._listen_conn is not None:
+            self._tasks_version_trusted = False
+            try:
+                await self._listen_conn.close()
+            except Exception:  # noqa: BLE001
+                pass
+            self._listen_conn = None
+        if self._flusher_task is not None:
+            self._flusher_task.cancel()
+            try:
+                await self._flusher_task
+            except asyncio.CancelledError:
+                pass
+            self._flusher_task = None
+        await self.flush()
+        await self.engine.dispose()
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=_FLUSH_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:  # noqa: BLE001
+                logger.error("Task state flush failed: %s", e)
+
+    async def flush(self):
+        """Writes all buffered task states in a single upsert."""
+        async with self._flush_lock:
+            self._flush_event.clear()
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self._upsert_task_rows(list(batch.values()))
+            except Exception:
+                # Put back anything that hasn't been superseded meanwhile; the next flush retries.
+                for task_id, row in batch.items():
+                    self._pending.setdefault(task_id, row)
+                raise
+
+    async def _flush_if_pending(self, task_id: str):
+        # Also wait out an in-flight flush, which may hold this task's row.
+        if task_id in self._pending or self._flush_lock.locked():
+            await self.flush()
+
+    async def _upsert_task_rows(self, rows: List[Dict[str, Any]]):
+        from sqlalchemy import case, literal_column
+
+        # A cancel flag already in the row survives the write: buffered state written by the
+        # downloader carries its own (older) options and must not undo a cancel request.
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+
+            cancelled = _pg_merge_sql(
+                "excluded.options", "'{\"cancel_requested\": true}'::jsonb", "options" in self._jsonb_columns
+            )
+            options_expr = literal_column(
+                f"CASE WHEN tasks.options->>'cancel_requested' = 'true' THEN {cancelled} ELSE excluded.options END"
+            )
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+            options_expr = literal_column(
+                "CASE WHEN json_extract(tasks.options, '$.cancel_requested') = 1 "
+                "THEN json_set(COALESCE(excluded.options, '{}'), '$.cancel_requested', json('true')) "
+                "ELSE excluded.options END"
+            )
+
+        table = Task.__table__
+        stmt = insert(table).values(rows)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={
+                "status": excluded.status,
+                "progress": excluded.progress,
+                "message": excluded.message,
+                "playlist_info": excluded.playlist_info,
+                "options": options_expr,
+                "s3_key": excluded.s3_key,
+                "updated_at": excluded.updated_at,
+                # Only bump status_updated_at on an actual status transition.
+                "status_updated_at": case(
+                    (table.c.status == excluded.status, table.c.status_updated_at),
+                    else_=excluded.status_updated_at,
+                ),
+            },
+        )
+        async with self.async_session() as session:
+            await session.execute(stmt)
+            await session.commit()
+            self._bump_tasks_version()
+
     async def create_task(self, task_id: str, url: str, options: Optional[dict] = None, owner_id: Optional[str] = None):
+        now = datetime.utcnow()
         async with self.async_session() as session:
             task = Task(
                 id=task_id, 
                 status="pending", 
                 message="Queued", 
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow(),
-                status_updated_at=datetime.utcnow(),
+                created_at=now,
+                updated_at=now,
+                status_updated_at=now,
                 options=options or {},
                 owner_id=owner_id # Save specific owner
             )
@@ -188,20 +510,101 @@ class DatabaseManager:
             task.playlist_info = {"url": url} 
             session.add(task)
             await session.commit()
+            self._bump_tasks_version()
 
     async def save_full_task_state(self, task_id: str, full_state_dict: dict):
         """
         Syncs the in-memory dict state to Postgres.
+
+        Progress updates within the same status are buffered and coalesced per
+        task by the background flusher; status changes are written through.
+        """
+        new_status = full_state_dict.get("status")
+        if not new_status or "progress" not in full_state_dict:
+            # Partial state: merge against the stored row.
+            await self._flush_if_pending(task_id)
+            self._last_status.pop(task_id, None)
+            await self._merge_task_state(task_id, full_state_dict)
+            return
+
+        now = datetime.utcnow()
+        self._pending[task_id] = {
+            "id": task_id,
+            "status": new_status,
+            "progress": full_state_dict.get("progress") or 0,
+            "message": full_state_dict.get("message"),
+            "playlist_info": full_state_dict.get("playlist"),
+            "options": full_state_dict.get("options"),
+            "s3_key": full_state_dict.get("zip_path"),
+            "created_at": now,
+            "updated_at": now,
+            "status_updated_at": now,
+        }
+
+        # Status transitions are written through so owner-scoped status counts
+        # (capacity checks) never see a stale status.
+        status_changed = self._last_status.get(task_id) != new_status
+        if new_status in _FLUSH_NOW_STATUSES:
+            self._last_status.pop(task_id, None)
+        else:
+            self._last_status[task_id] = new_status
+
+        if self._flusher_task is None or status_changed or new_status in _FLUSH_NOW_STATUSES:
+            await self.flush()
+        elif len(self._pending) >= _FLUSH_MAX_PENDING:
+            self._flush_event.set()
+
+    async def update_playlist_fields(
+        self,
+        task_id: str,
+        patch: Dict[str, Any],
+        *,
+        status: Optional[str] = None,
+        message: Optional[str] = None,
+    ) -> bool:
+        """
+        Merges `patch` into playlist_info server-side (jsonb `||` on Postgres,
+        json_patch on SQLite) instead of reading and rewriting the whole blob.
+        Optionally sets status/message in the same UPDATE.
         """
+        from sqlalchemy import case, cast, literal, literal_column, update
+
+        if self.engine.dialect.name == "postgresql":
+            jsonb = "playlist_info" in self._jsonb_columns
+            current = Task.playlist_info if jsonb else cast(Task.playlist_info, JSONB)
+            merged = func.coalesce(current, literal_column("'{}'::jsonb")).op("||")(literal(patch, JSONB))
+            if not jsonb:
+                merged = cast(merged, JSON)
+        else:
+            merged = func.json_patch(func.coalesce(Task.playlist_info, literal_column("'{}'")), json.dumps(patch))
+
+        now = datetime.utcnow()
+        values: Dict[str, Any] = {"playlist_info": merged, "updated_at": now}
+        if status is not None:
+            values["status"] = status
+            values["status_updated_at"] = case((Task.status == status, Task.status_updated_at), else_=now)
+            self._last_status.pop(task_id, None)
+        if message is not None:
+            values["message"] = message
+
+        await self._flush_if_pending(task_id)
+        async with self.async_session() as session:
+            result = await session.execute(update(Task).where(Task.id == task_id).values(**values))
+            await session.commit()
+            self._bump_tasks_version()
+            return result.rowcount == 1
+
+    async def _merge_task_state(self, task_id: str, full_state_dict: dict):
         async with self.async_session() as session:
             task = await session.get(Task, task_id)
             if not task:
                 task = Task(id=task_id)
                 session.add(task)
 
+            now = datetime.utcnow()
             new_status = full_state_dict.get("status")
             if new_status and new_status != task.status:
-                task.status_updated_at = datetime.utcnow()
+                task.status_updated_at = now
 
             task.status = new_status or task.status
             task.progress = full_state_dict.get("progress", task.progress or 0)
@@ -209,9 +612,10 @@ class DatabaseManager:
             task.playlist_info = full_state_dict.get("playlist")
             task.options = full_state_dict.get("options")
             task.zip_path = full_state_dict.get("zip_path")
-            task.updated_at = datetime.utcnow()
+            task.updated_at = now
             
             await session.commit()
+            self._bump_tasks_version()
 
     async def cleanup_interrupted_tasks(self):
         """
@@ -227,6 +631,7 @@ class DatabaseManager:
             )
             await session.execute(stmt)
             await session.commit()
+            self._bump_tasks_version()
 
     async def get_all_tasks(self, limit: int = 50, owner_id: Optional[str] = None):
         from sqlalchemy import select, desc
@@ -242,35 +647,39 @@ class DatabaseManager:
             tasks = result.scalars().all()
             
             # Reconstruct Dict format for Server compatibility
-            data = {}
-            for t in tasks:
-                playlist_info = t.playlist_info or {}
-                data[t.id] = {
-                    "id": t.id,
-                    "owner_id": t.owner_id,
-                    "status": t.status,
-                    "progress": t.progress,
-                    "message": t.message,
-                    "created_at": _to_iso_z(t.created_at),
-                    "updated_at": _to_iso_z(t.updated_at or t.created_at),
-                    "status_updated_at": _to_iso_z(t.status_updated_at or t.created_at),
-                    "playlist": playlist_info,
-                    "options": t.options,
-                    "zip_path": t.zip_path,
-                    # Convenience fields for UI
-                    "title": playlist_info.get("title") or playlist_info.get("url") or "",
-                    "provider": playlist_info.get("provider") or "",
-                    "thumbnail": playlist_info.get("thumbnail") or playlist_info.get("cover_url"),
-                    "track_count": playlist_info.get("track_count")
-                }
-            return data
+            return {t.id: _task_to_dict(t) for t in tasks}
+
+    async def list_tasks_for_owner(self, owner_id: str, limit: int = 50) -> List[Dict]:
+        """
+        Same rows as get_all_tasks, returned as a list straight from the cursor
+        (no intermediate id-keyed dict).
+        """
+        from sqlalchemy import select, desc
+        async with self.async_session() as session:
+            stmt = (
+                select(Task)
+                .where(Task.owner_id == owner_id)
+                .order_by(desc(Task.created_at))
+                .limit(limit)
+            )
+            result = await session.execute(stmt)
+            return [_task_to_dict(t) for t in result.scalars()]
 
     async def get_recent_tasks(self, limit: int = 10, owner_id: Optional[str] = None):
         # Re-using logic, or keeping distinct if the interface differs significantly
         # accessing get_all_tasks internally or keeping separate for lightweight history
         from sqlalchemy import select, desc
         async with self.async_session() as session:
-            stmt = select(Task).where(Task.status == 'completed')
+            # History only needs a few playlist_info keys; extract them in SQL rather
+            # than transferring and decoding the whole blob (track list included).
+            stmt = select(
+                Task.id,
+                Task.playlist_info["title"].as_string(),
+                Task.playlist_info["provider"].as_string(),
+                Task.playlist_info["track_count"].as_integer(),
+                Task.zip_path,
+                Task.created_at,
+            ).where(Task.status == 'completed')
             
             # Privacy Filter
             if owner_id:
@@ -279,79 +688,82 @@ class DatabaseManager:
             stmt = stmt.order_by(desc(Task.created_at)).limit(limit)
             
             result = await session.execute(stmt)
-            tasks = result.scalars().all()
             
             history = []
-            for t in tasks:
+            for task_id, title, provider, track_count, zip_path, created_at in result:
                  history.append({
-                     "task_id": t.id,
-                     "title": t.playlist_info.get("title", "Unknown") if t.playlist_info else "Unknown",
-                     "provider": t.playlist_info.get("provider", "unknown") if t.playlist_info else "unknown",
-                     "track_count": t.playlist_info.get("track_count", 0) if t.playlist_info else 0,
-                     "zip_path": t.zip_path,
-                     "timestamp": _to_iso_z(t.created_at)
+                     "task_id": task_id,
+                     "title": title if title is not None else "Unknown",
+                     "provider": provider if provider is not None else "unknown",
+                     "track_count": track_count if track_count is not None else 0,
+                     "zip_path": zip_path,
+                     "timestamp": _to_iso_z(created_at)
                  })
             return history
 
     async def get_task(self, task_id: str) -> Optional[Dict]:
+        await self._flush_if_pending(task_id)
         async with self.async_session() as session:
             t = await session.get(Task, task_id)
             if not t: return None
-            playlist_info = t.playlist_info or {}
-            return {
-                "id": t.id,
-                "owner_id": t.owner_id,
-                "status": t.status,
-                "progress": t.progress,
-                "message": t.message,
-                "created_at": _to_iso_z(t.created_at),
-                "updated_at": _to_iso_z(t.updated_at or t.created_at),
-                "status_updated_at": _to_iso_z(t.status_updated_at or t.created_at),
-                "playlist": playlist_info,
-                "options": t.options,
-                "zip_path": t.zip_path,
-                # Convenience fields for UI
-                "title": playlist_info.get("title") or playlist_info.get("url") or "",
-                "provider": playlist_info.get("provider") or "",
-                "thumbnail": playlist_info.get("thumbnail") or playlist_info.get("cover_url"),
-                "track_count": playlist_info.get("track_count")
-            }
+            return _task_to_dict(t)
 
     async def delete_task(self, task_id: str, owner_id: Optional[str] = None):
-         async with self.async_session() as session:
-             task = await session.get(Task, task_id)
-             if task:
-                 # Security Check: Only delete if owner matches (strict)
-                 if owner_id is None or task.owner_id != owner_id:
-                     return False
-                 
-                 await session.delete(task)
-                 await session.commit()
-                 return True
+         from sqlalchemy import delete
+
+         # Security Check: Only delete if owner matches (strict)
+         if owner_id is None:
              return False
+         await self._flush_if_pending(task_id)
+         self._last_status.pop(task_id, None)
+         async with self.async_session() as session:
+             stmt = delete(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+             result = await session.execute(stmt)
+             await session.commit()
+             self._bump_tasks_version()
+             return result.rowcount == 1
 
     async def get_task_for_owner(self, task_id: str, owner_id: str) -> Optional[Dict]:
-        task = await self.get_task(task_id)
-        if not task:
-            return None
-        # Strict check: deny legacy/unowned tasks too
+        from sqlalchemy import select
+
+        # Strict check: deny legacy/unowned tasks too (owner predicate in the same query).
+        await self._flush_if_pending(task_id)
         async with self.async_session() as session:
-            t = await session.get(Task, task_id)
-            if not t or t.owner_id != owner_id:
-                return None
-        return task
+            stmt = select(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+            t = (await session.execute(stmt)).scalar_one_or_none()
+            return _task_to_dict(t) if t else None
 
     async def request_cancel(self, task_id: str, owner_id: str) -> bool:
+        """Sets options.cancel_requested with one owner-scoped UPDATE (no read-modify-write)."""
+        from sqlalchemy import literal_column, update
+
+        if self.engine.dialect.name == "postgresql":
+            options_expr = literal_column(
+                _pg_merge_sql("options", "'{\"cancel_requested\": true}'::jsonb", "options" in self._jsonb_columns)
+            )
+        else:
+            options_expr = literal_column("json_set(COALESCE(options, '{}'), '$.cancel_requested', json('true'))")
+
+        # Flush first so a buffered progress write can't overwrite the cancel flag.
+        await self._flush_if_pending(task_id)
         async with self.async_session() as session:
-            task = await session.get(Task, task_id)
-            if not task or task.owner_id != owner_id:
-                return False
-            options = task.options or {}
-            options["cancel_requested"] = True
-            task.options = options
-            task.updated_at = datetime.utcnow()
+            stmt = (
+                update(Task)
+                .where(Task.id == task_id, Task.owner_id == owner_id)
+                .values(options=options_expr, updated_at=datetime.utcnow())
+            )
+            result = await session.execute(stmt)
             await session.commit()
-            return True
+            self._bump_tasks_version()
+            return result.rowcount == 1
+
+    async def is_cancel_requested(self, task_id: str) -> bool:
+        """Reads only options.cancel_requested; no buffer flush needed since the flag is sticky."""
+        from sqlalchemy import select
+
+        async with self.async_session() as session:
+            stmt = select(Task.options["cancel_requested"].as_boolean()).where(Task.id == task_id)
+            return bool((await session.execute(stmt)).scalar())
 
     async def get_task_owner_id(self, task_id: str) -> Optional[str]:
         async with self.async_session() as session:
@@ -360,6 +772,17 @@ class DatabaseManager:
                 return None
             return task.owner_id
 
+    async def get_task_owner_and_zip(self, task_id: str) -> Optional[tuple[Optional[str], Optional[str]]]:
+        """Returns (owner_id, zip_path) for a task in one narrow query, or None."""
+        from sqlalchemy import select
+
+        async with self.async_session() as session:
+            stmt = select(Task.owner_id, Task.zip_path).where(Task.id == task_id)
+            row = (await session.execute(stmt)).first()
+            if row is None:
+                return None
+            return row[0], row[1]
+
     async def count_tasks_for_owner(self, *, owner_id: str, statuses: list[str]) -> int:
         from sqlalchemy import select
 
@@ -371,4 +794,49 @@ class DatabaseManager:
             count_val = result.scalar_one()
             return int(count_val or 0)
 
+    async def get_task_for_owner_with_count(
+        self, task_id: str, owner_id: str, *, statuses: list[str]
+    ) -> tuple[Optional[Dict], int]:
+        """
+        Fetches an owned task together with the owner's task count for `statuses`
+        in one round trip. Returns (None, 0) when the task isn't found/owned.
+        """
+        from sqlalchemy import select
+
+        await self._flush_if_pending(task_id)
+        async with self.async_session() as session:
+            count_subq = (
+                select(func.count())
+                .select_from(Task)
+                .where(Task.owner_id == owner_id, Task.status.in_(statuses))
+                .scalar_subquery()
+            )
+            stmt = select(Task, count_subq).where(Task.id == task_id, Task.owner_id == owner_id)
+            row = (await session.execute(stmt)).first()
+            if row is None:
+                return None, 0
+            return _task_to_dict(row[0]), int(row[1] or 0)
+
+    async def count_tasks_grouped(self, *, owner_id: str, groups: list[list[str]]) -> list[int]:
+        """
+        Counts an owner's tasks for several status groups in one round trip.
+        Returns one count per group, in the order given.
+        """
+        from sqlalchemy import select
+
+        all_statuses = {s for group in groups for s in group}
+        if not all_statuses:
+            return [0 for _ in groups]
+
+        async with self.async_session() as session:
+            stmt = (
+                select(Task.status, func.count())
+                .where(Task.owner_id == owner_id)
+                .where(Task.status.in_(all_statuses))
+                .group_by(Task.status)
+            )
+            result = await session.execute(stmt)
+            by_status = {status: int(count or 0) for status, count in result.all()}
+            return [sum(by_status.get(s, 0) for s in group) for group in groups]
+
 db = DatabaseManager()
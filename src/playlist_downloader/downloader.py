@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import Iterable
@@ -8,48 +9,100 @@ import httpx
 from tqdm import tqdm
 
 from .config import settings
-from .models import Playlist, Track
+from .models import Playlist, Track, playlist_dirname
 
 logger = logging.getLogger(__name__)
 
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:  # optional: faster event loop for the CLI download path
+    import uvloop
+
+    _loop_factory = uvloop.new_event_loop
+except ImportError:
+    _loop_factory = None
+
+_WRITE_BUFFER_BYTES = 1 << 20
+# Progress bars are refreshed per MiB rather than per chunk.
+_PROGRESS_STEP_BYTES = 1 << 20
+
 
 class DownloadError(Exception):
     """Raised when a track fails to download after retries."""
 
 
 def download_playlist(playlist: Playlist, destination: Path | None = None) -> Path:
+    with asyncio.Runner(loop_factory=_loop_factory) as runner:
+        return runner.run(download_playlist_async(playlist, destination))
+
+
+async def download_playlist_async(playlist: Playlist, destination: Path | None = None) -> Path:
+    """Download all tracks concurrently over one pooled (HTTP/2 when available) client.
+
+    Up to ``settings.downloader.concurrency`` tracks are in flight at once, so
+    wall-clock time tracks the slowest downloads rather than the sum of all.
+    """
     destination = destination or settings.ensure_download_dir()
-    playlist_dir = destination / playlist.tracks[0].target_filename(playlist.title).parent
+    playlist_dir = destination / playlist_dirname(playlist.title)
     playlist_dir.mkdir(parents=True, exist_ok=True)
     logger.info("Downloading %s tracks from %s", playlist.track_count, playlist.title)
 
-    with httpx.Client(timeout=settings.downloader.timeout_seconds) as client:
-        for track in tqdm(playlist.tracks, desc=f"{playlist.title}"):
-            _download_track(client, track, playlist, playlist_dir)
+    semaphore = asyncio.Semaphore(max(1, settings.downloader.concurrency))
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+
+    async with httpx.AsyncClient(
+        limits=limits,
+        http2=_HTTP2_AVAILABLE,
+        timeout=settings.downloader.timeout_seconds,
+    ) as client:
+        with tqdm(total=playlist.track_count, desc=f"{playlist.title}") as overall:
+
+            async def run(track: Track) -> None:
+                async with semaphore:
+                    try:
+                        await _download_track(client, track, playlist_dir / track.file_name())
+                    finally:
+                        overall.update(1)
+
+            results = await asyncio.gather(*(run(track) for track in playlist.tracks), return_exceptions=True)
+
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        for failure in failures:
+            logger.error("%s", failure)
+        raise failures[0]
 
     return playlist_dir
 
 
-def _download_track(client: httpx.Client, track: Track, playlist: Playlist, playlist_dir: Path) -> None:
+async def _download_track(client: httpx.AsyncClient, track: Track, target_file: Path) -> None:
     retries = settings.downloader.max_retries
-    target_file = playlist_dir / track.target_filename(playlist.title)
-    target_file.parent.mkdir(parents=True, exist_ok=True)
 
     for attempt in range(1, retries + 2):
         try:
-            with client.stream("GET", track.stream_url, follow_redirects=True) as response:
+            async with client.stream("GET", track.stream_url, follow_redirects=True) as response:
                 response.raise_for_status()
                 total = int(response.headers.get("content-length", 0))
-                with open(target_file, "wb") as file, tqdm(
+                with open(target_file, "wb", buffering=_WRITE_BUFFER_BYTES) as file, tqdm(
                     total=total,
                     unit="B",
                     unit_scale=True,
                     desc=track.title,
                     leave=False,
                 ) as progress:
-                    for chunk in response.iter_bytes(settings.downloader.chunk_size):
+                    downloaded = reported = 0
+                    async for chunk in response.aiter_bytes(settings.downloader.chunk_size):
                         file.write(chunk)
-                        progress.update(len(chunk))
+                        downloaded += len(chunk)
+                        if downloaded - reported >= _PROGRESS_STEP_BYTES:
+                            progress.update(downloaded - reported)
+                            reported = downloaded
+                    progress.update(downloaded - reported)
             logger.info("Saved %s", target_file)
             return
         except Exception as exc:  # noqa: BLE001
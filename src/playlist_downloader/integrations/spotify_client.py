@@ -1,10 +1,61 @@
 from __future__ import annotations
 
 import base64
+import json
+import random
+import threading
 import time
-from typing import Any, Dict, Optional, cast
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, cast
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # optional: much faster parsing of large playlist pages
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _json_loads = json.loads
+
+# Upper bound for a single server-requested wait; a worker thread shouldn't sleep longer.
+_MAX_RETRY_AFTER_SECONDS = 30.0
+
+
+class _JitteredRetry(Retry):
+    """Retry with up to 25% random jitter on the exponential backoff and a capped Retry-After.
+
+    Parallel page fetches that hit the same 429 would otherwise all retry in lockstep.
+    """
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return backoff * (1 + random.random() * 0.25) if backoff > 0 else backoff
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER_SECONDS)
+
+
+# 429/5xx and connection errors are retried by urllib3 (honouring Retry-After).
+_RETRY = _JitteredRetry(
+    total=6,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+
+_PAGE_SIZE = 100  # max page size for playlist tracks
+_PAGE_WORKERS = 8
+
+# Metadata for a URL is reused for a few minutes (retries, re-opening the same playlist).
+_METADATA_TTL_SECONDS = 300.0
+_METADATA_CACHE_MAX = 1024
 
 
 class SpotifyClient:
@@ -14,7 +65,18 @@ class SpotifyClient:
         self.token: Optional[str] = None
         self.token_expiry: float = 0
 
-    def _extract_id(self, url: str, kind: str) -> str:
+        # One keep-alive pool for accounts.spotify.com and api.spotify.com, so
+        # paginated requests reuse the TLS connection instead of re-handshaking.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=_RETRY)
+        self._session.mount("https://", adapter)
+
+        self._metadata_cache: Dict[str, Tuple[float, Tuple[Dict[str, Any], str]]] = {}
+        self._metadata_lock = threading.Lock()
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_id(url: str, kind: str) -> str:
         # Supports both open.spotify.com URLs and spotify: URIs.
         if f"{kind}/" in url:
             return url.split(f"{kind}/", 1)[1].split("?", 1)[0].split("/", 1)[0]
@@ -29,14 +91,14 @@ class SpotifyClient:
         auth_str = f"{self.client_id}:{self.client_secret}"
         b64_auth = base64.b64encode(auth_str.encode()).decode()
 
-        resp = requests.post(
+        resp = self._session.post(
             "https://accounts.spotify.com/api/token",
             data={"grant_type": "client_credentials"},
             headers={"Authorization": f"Basic {b64_auth}"},
             timeout=10,
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = _json_loads(resp.content)
         self.token = data["access_token"]
         self.token_expiry = time.time() + float(data["expires_in"]) - 60
         return cast(str, self.token)
@@ -47,60 +109,53 @@ class SpotifyClient:
         *,
         params: Optional[Dict[str, Any]] = None,
         timeout: int = 15,
-        max_retries: int = 6,
     ) -> Dict[str, Any]:
-        last_error: Optional[Exception] = None
-
-        for attempt in range(max_retries):
-            try:
-                token = self._get_token()
-                headers = {"Authorization": f"Bearer {token}"}
-                resp = requests.get(url, headers=headers, params=params, timeout=timeout)
-
-                if resp.status_code == 401:
-                    self.token = None
-                    self.token_expiry = 0
-                    if attempt < max_retries - 1:
-                        continue
+        # Transient failures are retried by the session adapter; only an expired
+        # token needs handling here.
+        for attempt in range(2):
+            token = self._get_token()
+            headers = {"Authorization": f"Bearer {token}"}
+            resp = self._session.get(url, headers=headers, params=params, timeout=timeout)
+
+            if resp.status_code == 401 and attempt == 0:
+                self.token = None
+                self.token_expiry = 0
+                continue
+
+            resp.raise_for_status()
+
+            data = _json_loads(resp.content)
+            if isinstance(data, dict) and data.get("error"):
+                err = data.get("error")
+                if isinstance(err, dict):
+                    msg = err.get("message") or "Spotify API error"
+                    status = err.get("status")
+                    raise RuntimeError(f"Spotify API error ({status}): {msg}")
+                raise RuntimeError(f"Spotify API error: {err}")
+
+            return cast(Dict[str, Any], data)
 
-                if resp.status_code == 429:
-                    retry_after = resp.headers.get("Retry-After")
-                    if retry_after and retry_after.isdigit():
-                        wait_s = float(int(retry_after))
-                    else:
-                        wait_s = float(min(2**attempt, 30))
-                    time.sleep(wait_s)
-                    continue
-
-                if 500 <= resp.status_code < 600:
-                    time.sleep(float(min(2**attempt, 10)))
-                    continue
-
-                resp.raise_for_status()
-
-                data = resp.json()
-                if isinstance(data, dict) and data.get("error"):
-                    err = data.get("error")
-                    if isinstance(err, dict):
-                        msg = err.get("message") or "Spotify API error"
-                        status = err.get("status")
-                        raise RuntimeError(f"Spotify API error ({status}): {msg}")
-                    raise RuntimeError(f"Spotify API error: {err}")
-
-                return cast(Dict[str, Any], data)
-
-            except Exception as e:  # noqa: BLE001
-                last_error = e
-                if attempt < max_retries - 1:
-                    time.sleep(float(min(2**attempt, 5)))
-                    continue
-                break
-
-        if last_error:
-            raise last_error
         raise RuntimeError("Spotify request failed")
 
     def get_metadata(self, url: str):
+        """Returns ``(data, kind)``; results are cached per URL, so treat ``data`` as read-only."""
+        now = time.monotonic()
+        with self._metadata_lock:
+            cached = self._metadata_cache.get(url)
+            if cached is not None and cached[0] > now:
+                return cached[1]
+
+        result = self._fetch_metadata(url)
+
+        with self._metadata_lock:
+            if len(self._metadata_cache) >= _METADATA_CACHE_MAX:
+                self._metadata_cache = {k: v for k, v in self._metadata_cache.items() if v[0] > now}
+                if len(self._metadata_cache) >= _METADATA_CACHE_MAX:
+                    self._metadata_cache.pop(next(iter(self._metadata_cache)))
+            self._metadata_cache[url] = (now + _METADATA_TTL_SECONDS, result)
+        return result
+
+    def _fetch_metadata(self, url: str) -> Tuple[Dict[str, Any], str]:
         if "playlist" in url:
             pid = self._extract_id(url, "playlist")
             return self._request_json(f"https://api.spotify.com/v1/playlists/{pid}"), "playlist"
@@ -113,12 +168,23 @@ class SpotifyClient:
         raise ValueError("Unsupported Spotify URL")
 
     def get_playlist_tracks(self, playlist_id: str):
-        tracks = []
-        url: Optional[str] = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
-        params: Optional[Dict[str, Any]] = {"limit": 100}
+        url = f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks"
+
+        # The first page reports the total; the remaining pages are fetched
+        # concurrently by offset over the pooled session instead of walking `next`.
+        first = self._request_json(url, params={"limit": _PAGE_SIZE, "offset": 0})
+        pages = [first]
 
-        while url:
-            data = self._request_json(url, params=params)
+        total = first.get("total")
+        if isinstance(total, int) and total > _PAGE_SIZE:
+            offsets = range(_PAGE_SIZE, total, _PAGE_SIZE)
+            with ThreadPoolExecutor(max_workers=min(_PAGE_WORKERS, len(offsets))) as executor:
+                pages.extend(
+                    executor.map(lambda offset: self._request_json(url, params={"limit": _PAGE_SIZE, "offset": offset}), offsets)
+                )
+
+        tracks = []
+        for data in pages:
             items = data.get("items") or []
             if isinstance(items, list):
                 for item in items:
@@ -127,7 +193,5 @@ class SpotifyClient:
                     t = item.get("track")
                     if t:
                         tracks.append(t)
-            url = cast(Optional[str], data.get("next"))
-            params = None
 
         return tracks
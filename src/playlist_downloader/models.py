@@ -1,45 +1,88 @@
 from __future__ import annotations
 
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Iterable, List, Optional
+from urllib.parse import quote
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, ConfigDict, field_validator
+
+# URLs are kept as plain strings; a scheme check is enough for provider payloads
+# and avoids building a parsed Url object per field per track.
+_HTTP_URL_RE = re.compile(r"^https?://[^/?#\s]", re.IGNORECASE)
+# Anything outside RFC 3986's reserved/unreserved set (spaces, non-ASCII) gets percent-encoded,
+# as HttpUrl used to do; existing %XX escapes are kept as they are.
+_URL_NEEDS_QUOTING_RE = re.compile(r"[^A-Za-z0-9\-._~:/?#\[\]@!$&'()*+,;=%]")
+_URL_SAFE_CHARS = "-._~:/?#[]@!$&'()*+,;=%"
+
+
+def _check_http_url(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip()
+    if not _HTTP_URL_RE.match(value):
+        raise ValueError("must be an http(s) URL")
+    if _URL_NEEDS_QUOTING_RE.search(value):
+        scheme, _, rest = value.partition("://")
+        host_end = next((i for i, char in enumerate(rest) if char in "/?#"), len(rest))
+        host, tail = rest[:host_end], rest[host_end:]
+        if not host.isascii():
+            host = host.encode("idna").decode("ascii")
+        value = f"{scheme}://{host}{quote(tail, safe=_URL_SAFE_CHARS)}"
+    return value
 
 
 class Track(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     title: str
     artist: Optional[str] = None
-    source_url: Optional[HttpUrl] = None
-    stream_url: HttpUrl
+    source_url: Optional[str] = None
+    stream_url: str
     duration_ms: Optional[int] = None
-    cover_url: Optional[HttpUrl] = None
+    cover_url: Optional[str] = None
     published_at: Optional[datetime] = None
 
+    _validate_urls = field_validator("source_url", "stream_url", "cover_url")(_check_http_url)
+
     def target_filename(self, playlist_title: str, ext: str = "mp3") -> Path:
-        safe_playlist = _sanitize_filename(playlist_title)
+        return Path(f"{_sanitize_filename(playlist_title)}/{self.file_name(ext)}")
+
+    def file_name(self, ext: str = "mp3") -> str:
         safe_title = _sanitize_filename(self.title)
         safe_artist = _sanitize_filename(self.artist or "unknown")
-        return Path(f"{safe_playlist}/{safe_artist} - {safe_title}.{ext}")
+        return f"{safe_artist} - {safe_title}.{ext}"
 
 
 class Playlist(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     title: str
     description: Optional[str] = None
-    cover_url: Optional[HttpUrl] = None
+    cover_url: Optional[str] = None
     tracks: List[Track]
     provider: str
     raw: Optional[Any] = None
 
+    _validate_urls = field_validator("cover_url")(_check_http_url)
+
     @property
     def track_count(self) -> int:
         return len(self.tracks)
 
 
+_SANITIZE_TABLE = str.maketrans({"/": "-", "<": None, ">": None, ":": None, "\\": None, "|": None, "?": None, "*": None})
+
+
+def playlist_dirname(playlist_title: str) -> str:
+    return _sanitize_filename(playlist_title)
+
+
 def _sanitize_filename(name: str) -> str:
-    return "".join(c for c in name.replace("/", "-") if c not in "<>:\\|?*").strip() or "untitled"
+    return name.translate(_SANITIZE_TABLE).strip() or "untitled"
 
 
 def collect_track_stats(tracks: Iterable[Track]) -> dict[str, Any]:
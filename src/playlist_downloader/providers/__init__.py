@@ -1,4 +1,12 @@
+from .batch import fetch_playlists
+from .http import close_http_client, get_http_client
 from .shopify import ShopifyPlaylistClient
 from .soundcloud import SoundCloudPlaylistClient
 
-__all__ = ["ShopifyPlaylistClient", "SoundCloudPlaylistClient"]
+__all__ = [
+    "ShopifyPlaylistClient",
+    "SoundCloudPlaylistClient",
+    "close_http_client",
+    "fetch_playlists",
+    "get_http_client",
+]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence
+
+from ..models import Playlist
+
+# Playlist-level fan-out; each SoundCloud fetch already runs its own track workers.
+_BATCH_WORKERS = 4
+
+
+def fetch_playlists(
+    fetch: Callable[[str], Playlist],
+    playlist_urls: Sequence[str],
+    max_workers: int = _BATCH_WORKERS,
+) -> List[Playlist]:
+    """Fetch several playlists concurrently, returned in input order.
+
+    ``fetch`` is typically a provider client's ``fetch_playlist``. The first
+    failure is raised once the remaining fetches have finished.
+    """
+    if len(playlist_urls) <= 1:
+        return [fetch(url) for url in playlist_urls]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(playlist_urls)))) as executor:
+        return list(executor.map(fetch, playlist_urls))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLFileCache:
+    """Small thread-safe key/value cache with per-entry expiry, persisted as JSON.
+
+    Meant for cheap-to-store, expensive-to-fetch provider lookups (OAuth tokens,
+    signed stream URLs) so a re-run doesn't repeat every API call. Writes are
+    batched: call ``save()`` once after a unit of work.
+    """
+
+    def __init__(self, path: Optional[Path]) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._loaded = False
+        self._dirty = False
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._dirty = True
+                return None
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        with self._lock:
+            self._load()
+            self._entries[key] = (value, time.time() + ttl_seconds)
+            self._dirty = True
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            live = {k: [v, exp] for k, (v, exp) in self._entries.items() if exp > now}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+                # Holds bearer tokens: keep it private to the user.
+                fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+                with os.fdopen(fd, "w") as handle:
+                    json.dump(live, handle)
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except OSError as exc:
+                logger.warning("Could not write cache %s: %s", self.path, exc)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text())
+            self._entries = {k: (v[0], float(v[1])) for k, v in raw.items()}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError) as exc:
+            logger.warning("Ignoring unreadable cache %s: %s", self.path, exc)
+            self._entries = {}
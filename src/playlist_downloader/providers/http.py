@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import atexit
+import json
+import threading
+from typing import Any, Optional
+
+import httpx
+
+try:  # optional: faster parsing of large provider payloads
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:  # httpx decodes br transparently when a brotli package is installed
+    import brotli  # noqa: F401
+
+    _ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        _ACCEPT_ENCODING = "br, gzip"
+    except ImportError:
+        _ACCEPT_ENCODING = "gzip"
+
+_client: Optional[httpx.Client] = None
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled client shared by the provider clients.
+
+    Keeps connections to the Shopify/SoundCloud API hosts alive across calls so
+    the TLS handshake is paid once per host instead of once per request.
+    Callers pass their own per-request timeout. Uses HTTP/2 when ``h2`` is
+    installed and only advertises encodings httpx can decode.
+    """
+    global _client
+    with _lock:
+        if _client is None or _client.is_closed:
+            _client = httpx.Client(
+                http2=_HTTP2_AVAILABLE,
+                headers={"Accept-Encoding": _ACCEPT_ENCODING},
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+                timeout=httpx.Timeout(15.0),
+            )
+        return _client
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parses JSON with orjson when installed; its decode errors subclass json.JSONDecodeError."""
+    return _loads(data)
+
+
+def response_json(response: httpx.Response) -> Any:
+    return _loads(response.content)
+
+
+def close_http_client() -> None:
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+atexit.register(close_http_client)
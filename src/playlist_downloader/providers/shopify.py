@@ -1,31 +1,126 @@
 from __future__ import annotations
 
+import io
 import json
 import logging
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
-from urllib.parse import parse_qs, urlparse
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import unquote_plus
 
 import httpx
 
+try:  # optional: stream large track arrays instead of materializing them
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
 from ..config import Settings, get_settings
 from ..models import Playlist, Track
+from .http import get_http_client, json_loads, response_json
 
 logger = logging.getLogger(__name__)
 
 SHOPIFY_API_VERSION = "2023-10"
 
+_INVALID_JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+# The only metaobject fields fetch_playlist reads.
+_PLAYLIST_FIELDS = frozenset(("title", "description", "cover", "tracks"))
+# Below roughly a hundred tracks a one-shot parse beats ijson's per-event overhead.
+_STREAM_PARSE_MIN_BYTES = 64 * 1024
+
+# Written readably, sent with whitespace collapsed (GraphQL ignores it).
+_PLAYLIST_QUERY = " ".join(
+    """
+    query Playlist($handle: MetaobjectHandleInput!) {
+      metaobjectByHandle(handle: $handle) {
+        id
+        handle
+        type
+        fields {
+          key
+          value
+        }
+      }
+    }
+    """.split()
+)
+
 
 class ShopifyPlaylistError(RuntimeError):
     pass
 
 
+def _iter_track_entries(raw_tracks: str) -> Iterable[Dict[str, Any]]:
+    if ijson is not None and len(raw_tracks) >= _STREAM_PARSE_MIN_BYTES:
+        # Each entry is handed to _to_track as it is parsed; no intermediate list of dicts.
+        return ijson.items(io.BytesIO(raw_tracks.encode()), "item", use_float=True)
+    return json_loads(raw_tracks)
+
+
+def _intern(value: Any) -> Any:
+    # Artist names and album covers repeat across a playlist; share one string per distinct value.
+    return sys.intern(value) if type(value) is str else value
+
+
+def _object_end(raw: str, start: int) -> int:
+    """Index just past the ``{...}`` opening at ``start``, matching nested braces outside strings."""
+    depth = 0
+    in_string = escaped = False
+    for pos in range(start, len(raw)):
+        char = raw[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return len(raw)
+
+
+def _salvage_track_entries(raw_tracks: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Parses each top-level ``{...}`` object on its own; returns the usable ones and a note per bad one."""
+    decoder = json.JSONDecoder()
+    entries: List[Dict[str, Any]] = []
+    problems: List[str] = []
+    pos = raw_tracks.find("{")
+    while pos != -1:
+        try:
+            entry, end = decoder.raw_decode(raw_tracks, pos)
+        except json.JSONDecodeError as exc:
+            problems.append(f"offset {pos}: {exc.msg}")
+            # Resume after the whole broken object, not at a "}" nested inside it.
+            end = _object_end(raw_tracks, pos)
+        else:
+            if isinstance(entry, dict):
+                if entry.get("stream_url") or entry.get("download_url"):
+                    entries.append(entry)
+                else:
+                    # _to_track would reject it and, with it, the whole playlist.
+                    problems.append(f"offset {pos}: no stream_url or download_url")
+        pos = raw_tracks.find("{", end)
+    return entries, problems
+
+
 @dataclass
 class ShopifyPlaylistClient:
     store_domain: Optional[str] = None
     access_token: Optional[str] = None
     metaobject_type: Optional[str] = None
+    http_client: Optional[httpx.Client] = field(default=None, repr=False)
     _settings: Settings = field(default_factory=get_settings)
+    _endpoint: str = field(init=False, repr=False)
+    _headers: Mapping[str, str] = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.store_domain = self.store_domain or self._settings.shopify.store_domain
@@ -35,47 +130,43 @@ class ShopifyPlaylistClient:
             raise ShopifyPlaylistError(
                 "Shopify store_domain and admin access token must be configured via CLI flags or PLAYLIST_SHOPIFY__* env vars."
             )
+        # Only the handle varies per request; build the rest once.
+        self._endpoint = f"https://{self.store_domain}/admin/api/{SHOPIFY_API_VERSION}/graphql.json"
+        self._headers = MappingProxyType(
+            {"X-Shopify-Access-Token": self.access_token, "Content-Type": "application/json"}
+        )
+
+    def _get_client(self) -> httpx.Client:
+        # Resolved lazily so constructing a client (e.g. just to validate config) opens nothing.
+        if self.http_client is None or self.http_client.is_closed:
+            self.http_client = get_http_client()
+        return self.http_client
 
     def fetch_playlist(self, playlist_url: str) -> Playlist:
         handle = self._extract_handle(playlist_url)
-        payload = {
-            "query": """
-                query Playlist($handle: MetaobjectHandleInput!) {
-                  metaobjectByHandle(handle: $handle) {
-                    id
-                    handle
-                    type
-                    fields {
-                      key
-                      value
-                    }
-                  }
-                }
-            """,
-            "variables": {
-                "handle": {"type": self.metaobject_type, "handle": handle},
+        logger.debug("Requesting playlist %s from %s", handle, self._endpoint)
+
+        response = self._get_client().post(
+            self._endpoint,
+            json={
+                "query": _PLAYLIST_QUERY,
+                "variables": {"handle": {"type": self.metaobject_type, "handle": handle}},
             },
-        }
-        endpoint = f"https://{self.store_domain}/admin/api/{SHOPIFY_API_VERSION}/graphql.json"
-        logger.debug("Requesting playlist %s from %s", handle, endpoint)
-
-        with httpx.Client(timeout=self._settings.downloader.timeout_seconds) as client:
-            response = client.post(
-                endpoint,
-                json=payload,
-                headers={
-                    "X-Shopify-Access-Token": self.access_token,
-                    "Content-Type": "application/json",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+            headers=self._headers,
+            timeout=self._settings.downloader.timeout_seconds,
+        )
+        response.raise_for_status()
+        data = response_json(response)
 
         metaobject = data.get("data", {}).get("metaobjectByHandle")
         if not metaobject:
             raise ShopifyPlaylistError("Playlist metaobject not found; verify handle and access scopes.")
 
-        field_map = {field["key"]: field.get("value") for field in metaobject.get("fields", [])}
+        field_map = {
+            field["key"]: field.get("value")
+            for field in metaobject.get("fields", ())
+            if field["key"] in _PLAYLIST_FIELDS
+        }
         playlist_title = field_map.get("title") or metaobject.get("handle", "Untitled Playlist")
         playlist_description = field_map.get("description")
         cover_url = field_map.get("cover")
@@ -85,11 +176,20 @@ class ShopifyPlaylistClient:
             raise ShopifyPlaylistError("Playlist metaobject missing 'tracks' field")
 
         try:
-            track_entries = json.loads(raw_tracks)
-        except json.JSONDecodeError as exc:  # noqa: PERF203
-            raise ShopifyPlaylistError("Tracks field is not valid JSON") from exc
-
-        tracks = [self._to_track(entry) for entry in track_entries]
+            tracks = [self._to_track(entry) for entry in _iter_track_entries(raw_tracks)]
+        except _INVALID_JSON_ERRORS as exc:
+            # One malformed entry shouldn't sink a long playlist: keep every object that still parses.
+            entries, problems = _salvage_track_entries(raw_tracks)
+            if not entries:
+                raise ShopifyPlaylistError("Tracks field is not valid JSON") from exc
+            logger.warning(
+                "Tracks field for %s is not valid JSON; recovered %d entries, skipped %d: %s",
+                handle,
+                len(entries),
+                len(problems),
+                "; ".join(problems[:5]),
+            )
+            tracks = [self._to_track(entry) for entry in entries]
 
         return Playlist(
             id=metaobject.get("id", handle),
@@ -102,18 +202,29 @@ class ShopifyPlaylistClient:
         )
 
     def _extract_handle(self, playlist_url: str) -> str:
-        parsed = urlparse(playlist_url)
-        if parsed.netloc and not self.store_domain:
-            self.store_domain = parsed.netloc
-        if parsed.query:
-            query = parse_qs(parsed.query)
-            if "handle" in query:
-                return query["handle"][0]
-            if "playlist" in query:
-                return query["playlist"][0]
-        path_parts = [part for part in parsed.path.split("/") if part]
-        if path_parts:
-            return path_parts[-1]
+        # Plain string scanning; this only needs the host, one query value or the last path segment.
+        url = playlist_url.partition("#")[0]
+        url, _, query = url.partition("?")
+        scheme_sep = url.find("://")
+        if scheme_sep >= 0:
+            netloc, _, path = url[scheme_sep + 3 :].partition("/")
+        else:
+            netloc, path = "", url
+        if netloc and not self.store_domain:
+            self.store_domain = netloc
+        if query:
+            params: Dict[str, str] = {}
+            for pair in query.split("&"):
+                key, _, value = pair.partition("=")
+                if value and key in ("handle", "playlist"):
+                    params.setdefault(key, unquote_plus(value))
+            if "handle" in params:
+                return params["handle"]
+            if "playlist" in params:
+                return params["playlist"]
+        last_segment = path.rstrip("/").rpartition("/")[2]
+        if last_segment:
+            return last_segment
         raise ShopifyPlaylistError("Unable to determine playlist handle from URL")
 
     def _to_track(self, entry: Dict[str, Any]) -> Track:
@@ -123,9 +234,9 @@ class ShopifyPlaylistClient:
         return Track(
             id=str(entry.get("id") or entry.get("title")),
             title=entry.get("title", "Untitled"),
-            artist=entry.get("artist"),
+            artist=_intern(entry.get("artist")),
             stream_url=stream_url,
             source_url=entry.get("source_url") or entry.get("stream_url"),
             duration_ms=entry.get("duration"),
-            cover_url=entry.get("cover"),
+            cover_url=_intern(entry.get("cover")),
         )
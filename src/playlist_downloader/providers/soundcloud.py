@@ -2,23 +2,47 @@ from __future__ import annotations
 
 import base64
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
-from urllib.parse import urlparse
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 
 import httpx
 
 from ..config import Settings, get_settings
 from ..models import Playlist, Track
+from .cache import TTLFileCache
+from .http import get_http_client, response_json
 
 logger = logging.getLogger(__name__)
 
+# Concurrent stream-URL lookups per playlist (kept modest for SoundCloud rate limits).
+_HYDRATE_WORKERS = 10
+_TOKEN_REQUEST_BODY = MappingProxyType({"grant_type": "client_credentials"})
+# Read-only stand-in for a missing "user" object.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
 
 class SoundCloudError(RuntimeError):
     pass
 
 
+_caches: Dict[Optional[Path], TTLFileCache] = {}
+_caches_lock = threading.Lock()
+
+
+def _get_cache(path: Optional[Path]) -> TTLFileCache:
+    # One cache per file per process, so every client instance shares lookups.
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = TTLFileCache(path)
+        return cache
+
+
 def _basic_auth_header(client_id: str, client_secret: str) -> str:
     token = f"{client_id}:{client_secret}".encode()
     return base64.b64encode(token).decode()
@@ -28,22 +52,45 @@ def _basic_auth_header(client_id: str, client_secret: str) -> str:
 class SoundCloudPlaylistClient:
     client_id: Optional[str] = None
     client_secret: Optional[str] = None
+    http_client: Optional[httpx.Client] = field(default=None, repr=False)
+    use_cache: bool = True
     _settings: Settings = field(default_factory=get_settings)
     _token: Optional[str] = field(default=None, init=False)
     _token_expiry: float = field(default=0, init=False)
+    _cache: TTLFileCache = field(init=False, repr=False)
+    _token_endpoint: str = field(init=False, repr=False)
+    _token_headers: Dict[str, str] = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.client_id = self.client_id or self._settings.soundcloud.client_id
         self.client_secret = self.client_secret or self._settings.soundcloud.client_secret
         if not (self.client_id and self.client_secret):
             raise SoundCloudError("SoundCloud client_id and client_secret must be configured via env or CLI.")
+        self._cache = _get_cache(self._settings.soundcloud.cache_file if self.use_cache else None)
+        self._token_endpoint = f"{self._settings.soundcloud.auth_base}/oauth/token"
+        self._token_headers = {
+            "Authorization": f"Basic {_basic_auth_header(self.client_id, self.client_secret)}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        }
+
+    def _get_client(self) -> httpx.Client:
+        # Resolved lazily so constructing a client (e.g. just to validate config) opens nothing.
+        if self.http_client is None or self.http_client.is_closed:
+            self.http_client = get_http_client()
+        return self.http_client
 
     def fetch_playlist(self, playlist_url: str) -> Playlist:
-        resolved = self._resolve_url(playlist_url)
+        # One token check per playlist; it's valid for about an hour, far longer than a fetch.
+        token = self._ensure_token()
+        resolved = self._resolve_url(playlist_url, token)
         if resolved.get("kind") != "playlist":
             raise SoundCloudError("Provided URL does not resolve to a playlist")
         playlist_id = str(resolved.get("id"))
-        tracks = [self._hydrate_track(track) for track in resolved.get("tracks", [])]
+        raw_tracks = resolved.get("tracks", [])
+        # Each track needs its own stream-URL lookup; overlap them instead of paying N round trips.
+        with ThreadPoolExecutor(max_workers=max(1, min(_HYDRATE_WORKERS, len(raw_tracks)))) as executor:
+            tracks = list(executor.map(lambda data: self._hydrate_track(data, token), raw_tracks))
+        self._cache.save()
         return Playlist(
             id=playlist_id,
             title=resolved.get("title", "Untitled Playlist"),
@@ -55,57 +102,75 @@ class SoundCloudPlaylistClient:
         )
 
     # --- internal helpers -------------------------------------------------
-    def _resolve_url(self, playlist_url: str) -> Dict[str, Any]:
-        token = self._ensure_token()
+    def _resolve_url(self, playlist_url: str, token: str) -> Dict[str, Any]:
         endpoint = f"{self._settings.soundcloud.api_base}/resolve"
         headers = {"Authorization": f"OAuth {token}", "Accept": "application/json"}
-        with httpx.Client(timeout=self._settings.downloader.timeout_seconds) as client:
-            response = client.get(endpoint, params={"url": playlist_url}, headers=headers)
-            response.raise_for_status()
-            return response.json()
-
-    def _hydrate_track(self, track_data: Dict[str, Any]) -> Track:
-        track_id = track_data.get("id")
-        stream_url = self._resolve_stream_url(track_id)
-        user = track_data.get("user", {})
+        response = self._get_client().get(
+            endpoint,
+            params={"url": playlist_url},
+            headers=headers,
+            timeout=self._settings.downloader.timeout_seconds,
+        )
+        response.raise_for_status()
+        return response_json(response)
+
+    def _hydrate_track(self, track_data: Dict[str, Any], token: str) -> Track:
+        track_id = str(track_data.get("id"))
+        stream_url = self._resolve_stream_url(track_id, token)
+        user = track_data.get("user") or _EMPTY
         return Track(
-            id=str(track_id),
+            id=track_id,
             title=track_data.get("title", "Untitled"),
             artist=user.get("username"),
             stream_url=stream_url,
             source_url=track_data.get("permalink_url"),
             duration_ms=track_data.get("duration"),
-            cover_url=track_data.get("artwork_url") or track_data.get("user", {}).get("avatar_url"),
+            cover_url=track_data.get("artwork_url") or user.get("avatar_url"),
             published_at=None,
         )
 
-    def _resolve_stream_url(self, track_id: int) -> str:
-        token = self._ensure_token()
+    def _resolve_stream_url(self, track_id: str, token: str) -> str:
+        cache_key = f"sc:stream:{track_id}"
+        cached = self._cache.get(cache_key)
+        if cached:
+            return cached
+
         endpoint = f"{self._settings.soundcloud.api_base}/tracks/{track_id}/stream"
         headers = {"Authorization": f"OAuth {token}", "Accept": "application/json"}
-        with httpx.Client(timeout=self._settings.downloader.timeout_seconds, follow_redirects=True) as client:
-            response = client.get(endpoint, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            url = data.get("url") or data.get("redirect_url") or data.get("redirectUri")
-            if not url:
-                raise SoundCloudError("Stream URL missing in response; track might be blocked for streaming.")
-            return url
+        response = self._get_client().get(
+            endpoint,
+            headers=headers,
+            timeout=self._settings.downloader.timeout_seconds,
+            follow_redirects=True,
+        )
+        response.raise_for_status()
+        data = response_json(response)
+        url = data.get("url") or data.get("redirect_url") or data.get("redirectUri")
+        if not url:
+            raise SoundCloudError("Stream URL missing in response; track might be blocked for streaming.")
+        self._cache.set(cache_key, url, self._settings.soundcloud.stream_url_ttl_seconds)
+        return url
 
     def _ensure_token(self) -> str:
         now = time.time()
-        if self._token and now < self._token_expiry - 60:
+        if self._token_expiry - 60 > now:
             return self._token
-        auth_endpoint = f"{self._settings.soundcloud.auth_base}/oauth/token"
-        headers = {
-            "Authorization": f"Basic {_basic_auth_header(self.client_id, self.client_secret)}",
-            "Content-Type": "application/x-www-form-urlencoded",
-        }
-        data = {"grant_type": "client_credentials"}
-        with httpx.Client(timeout=self._settings.downloader.timeout_seconds) as client:
-            response = client.post(auth_endpoint, data=data, headers=headers)
-            response.raise_for_status()
-            payload = response.json()
-            self._token = payload["access_token"]
-            self._token_expiry = now + int(payload.get("expires_in", 3600))
+        token_key = f"sc:token:{self.client_id}"
+        cached = self._cache.get(token_key)
+        if cached:
+            self._token, self._token_expiry = cached[0], float(cached[1])
             return self._token
+        response = self._get_client().post(
+            self._token_endpoint,
+            data=_TOKEN_REQUEST_BODY,
+            headers=self._token_headers,
+            timeout=self._settings.downloader.timeout_seconds,
+        )
+        response.raise_for_status()
+        payload = response_json(response)
+        self._token = payload["access_token"]
+        self._token_expiry = now + int(payload.get("expires_in", 3600))
+        # Cached until shortly before expiry so a cached token is always usable.
+        self._cache.set(token_key, [self._token, self._token_expiry], max(0.0, self._token_expiry - now - 60))
+        self._cache.save()
+        return self._token
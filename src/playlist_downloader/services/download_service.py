@@ -2,24 +2,164 @@ from __future__ import annotations
 
 import base64
 import asyncio
-from contextlib import contextmanager
+import heapq
+import io
+from contextlib import asynccontextmanager
 import logging
 import os
 import re
+import shlex
 import shutil
-import subprocess
-import tempfile
 import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional, cast
+from typing import IO, Any, Dict, List, Optional, Tuple, Union, cast
 import random
+import httpx
 import yt_dlp
 
+from ..config import DEFAULT_USER_AGENTS
 from ..core.paths import DOWNLOADS_DIR, PROJECT_ROOT
 from ..integrations.spotify_client import SpotifyClient
 from ..utils.filenames import sanitize_filename
 
+# Cookie contents from YTDLP_COOKIES_URL/B64 are reused this long before refetching.
+_COOKIE_CACHE_TTL_SECONDS = 300.0
+_COOKIE_FILE_MAX_BYTES = 5_000_000
+_HTTP_URL_RE = re.compile(r"^https?://", re.IGNORECASE)
+# Errors worth retrying with another player client; deliberately loose (any "bot" substring counts).
+_BOT_CHECK_RE = re.compile(r"confirm you|bot|429|Sign in")
+# Errors that mean YouTube is throttling this server's IP.
+_THROTTLED_RE = re.compile(r"confirm you[\u2019']re not a bot|temporarily limiting requests|429")
+# spotdl is killed only after this long without any output.
+_SPOTDL_IDLE_TIMEOUT_SECONDS = 120.0
+_ZIP_COPY_BUFFER_BYTES = 1024 * 1024
+# Lowercase suffixes (with the dot, as os.path.splitext returns them) counted as track output.
+_AUDIO_EXTS = frozenset((".mp3", ".m4a", ".flac", ".wav", ".opus", ".ogg"))
+# yt-dlp YouTube player clients in rotation order (None = yt-dlp's default).
+_PLAYER_CLIENTS: Tuple[Optional[str], ...] = (None, "ios", "android", "web", "tv")
+# How long a bot-checked client is skipped by every task.
+_CLIENT_THROTTLE_TTL_SECONDS = 600.0
+# Read chunks of spotdl output kept for the error message.
+_SPOTDL_TAIL_CHUNKS = 64
+# Browser profile dirs under %LOCALAPPDATA% used by the Windows cookie-browser probe.
+_WIN_CHROME_PROFILE_DIR = r"Google\Chrome\User Data"
+_WIN_EDGE_PROFILE_DIR = r"Microsoft\Edge\User Data"
+
+
+@dataclass(frozen=True, slots=True)
+class _YtDlpRuntimeSettings:
+    """yt-dlp related settings, read and coerced once per service."""
+
+    player_client: str
+    po_token: str
+    po_provider: str
+    use_oauth: bool
+    sleep_interval: float
+    max_sleep_interval: float
+    sleep_interval_requests: int
+    retries: int
+    fragment_retries: int
+    extractor_retries: int
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "_YtDlpRuntimeSettings":
+        return cls(
+            player_client=cast(str, getattr(settings, "YTDLP_YOUTUBE_PLAYER_CLIENT", "") or ""),
+            po_token=cast(str, getattr(settings, "YTDLP_PO_TOKEN", "") or ""),
+            po_provider=cast(str, getattr(settings, "YTDLP_PO_PROVIDER", "web")),
+            use_oauth=bool(getattr(settings, "YTDLP_USE_OAUTH", False)),
+            sleep_interval=float(getattr(settings, "YTDLP_SLEEP_INTERVAL", 0) or 0),
+            max_sleep_interval=float(getattr(settings, "YTDLP_MAX_SLEEP_INTERVAL", 0) or 0),
+            sleep_interval_requests=int(getattr(settings, "YTDLP_SLEEP_INTERVAL_REQUESTS", 0) or 0),
+            retries=int(getattr(settings, "YTDLP_RETRIES", 0) or 0),
+            fragment_retries=int(getattr(settings, "YTDLP_FRAGMENT_RETRIES", 0) or 0),
+            extractor_retries=int(getattr(settings, "YTDLP_EXTRACTOR_RETRIES", 0) or 0),
+        )
+
+    def static_ydl_opts(self) -> Dict[str, Any]:
+        """Flat yt-dlp options fixed by config; unset (zero/false) settings are left out entirely."""
+        opts: Dict[str, Any] = {}
+        if self.use_oauth:
+            opts["username"] = "oauth2"
+            opts["password"] = ""
+        # Gentle pacing to reduce cloud-IP throttling.
+        # These options are supported by yt-dlp and help on hosts where YouTube is aggressive.
+        if self.sleep_interval > 0:
+            opts["sleep_interval"] = self.sleep_interval
+        if self.max_sleep_interval > 0:
+            opts["max_sleep_interval"] = self.max_sleep_interval
+        if self.sleep_interval_requests > 0:
+            opts["sleep_interval_requests"] = self.sleep_interval_requests
+        # Retries help on shared cloud IPs where YouTube rate-limits aggressively.
+        if self.retries > 0:
+            opts["retries"] = self.retries
+        if self.fragment_retries > 0:
+            opts["fragment_retries"] = self.fragment_retries
+        if self.extractor_retries > 0:
+            opts["extractor_retries"] = self.extractor_retries
+        return opts
+
+
+def _usable_cpu_count() -> int:
+    # Honours CPU affinity (containers pinned to a subset of cores) where the OS exposes it.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _rotation_backoff(attempt_idx: int) -> float:
+    """Seconds to wait before the next client: yt-dlp's 0.25 * 1.5**n schedule, capped, with jitter."""
+    # Jitter keeps concurrent workers from rotating in lockstep.
+    return min(60.0, 0.25 * 1.5**attempt_idx) * random.uniform(0.8, 1.2)
+
+
+def _scan_audio_files(root: Path) -> Dict[Path, float]:
+    """Audio files under ``root`` mapped to their mtime, from a single scandir walk."""
+    found: Dict[Path, float] = {}
+    pending = [str(root)]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in _AUDIO_EXTS and entry.is_file():
+                    found[Path(entry.path)] = entry.stat().st_mtime
+    return found
+
+
+def _write_file_atomic(target: Path, data: bytes) -> None:
+    # Write-then-rename so the spotdl subprocess never reads a half-written file.
+    tmp = target.with_name(target.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, target)
+
+
+def _zip_dir(root: Path, out_path: Path) -> str:
+    """Zip every file under ``root`` (paths relative to it) into ``out_path``.
+
+    Audio and cover art are already compressed, so entries are stored rather than
+    deflated, and copied with 1 MiB buffers instead of ZipFile.write's 8 KiB.
+    """
+    with zipfile.ZipFile(out_path, "w", zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for name in sorted(filenames):
+                path = os.path.join(dirpath, name)
+                info = zipfile.ZipInfo.from_file(path, os.path.relpath(path, root))
+                with open(path, "rb") as src, zf.open(info, "w", force_zip64=True) as dst:
+                    shutil.copyfileobj(src, dst, _ZIP_COPY_BUFFER_BYTES)
+    return str(out_path)
+
 
 class DownloadService:
     def __init__(self, *, settings: Any, db: Any, spotify_client: SpotifyClient):
@@ -28,25 +168,110 @@ class DownloadService:
         self._spotify = spotify_client
 
         # Global concurrency limiter (shared across tasks)
-        max_workers = int(getattr(settings, "YTDLP_MAX_WORKERS", 2))
+        # Each worker drives a yt-dlp download plus an ffmpeg child, so more than ~2 per usable
+        # CPU only adds memory pressure and throttling; cap a generous setting on small pods.
+        max_workers = max(1, min(int(getattr(settings, "YTDLP_MAX_WORKERS", 2)), _usable_cpu_count() * 2))
+        self._max_workers = max_workers
         self._files_semaphore = asyncio.Semaphore(max_workers)
+        # Track downloads hold a thread for minutes; keep them off the default executor,
+        # which also serves DNS lookups (getaddrinfo) and short helpers.
+        self._download_executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ytdlp")
         # Per-owner task-level queue: prevents one user's stuck download from
         # blocking everyone else on a shared single-instance deployment.
         self._owner_download_locks: Dict[str, asyncio.Lock] = {}
-        self._owner_download_locks_guard = asyncio.Lock()
-
-    async def _get_owner_lock(self, owner_id: Optional[str]) -> asyncio.Lock:
+        # (source key, monotonic expiry, cookies.txt bytes)
+        self._cookie_cache: Optional[Tuple[str, float, bytes]] = None
+        self._cookie_cache_lock = asyncio.Lock()
+        # Rotation pools are fixed for the process; parse them once, not per yt-dlp call.
+        raw_proxy = cast(str, getattr(settings, "YTDLP_PROXY", "") or "")
+        self._proxy_pool: List[str] = [p.strip() for p in raw_proxy.split(",") if p.strip()]
+        self._user_agents: Tuple[str, ...] = tuple(getattr(settings, "REAL_USER_AGENTS", None) or DEFAULT_USER_AGENTS)
+        self._yt_opts = _YtDlpRuntimeSettings.from_settings(settings)
+        self._static_ydl_opts = self._yt_opts.static_ydl_opts()
+        # Player client -> monotonic time until which YouTube is assumed to bot-check it.
+        self._throttled_until: Dict[Optional[str], float] = {}
+
+    def close(self) -> None:
+        """Release the download threads (idle ones exit; running downloads are not interrupted)."""
+        self._download_executor.shutdown(wait=False)
+
+    def _client_rotation(self, preferred: Optional[str]) -> List[Optional[str]]:
+        """Player clients to try for one track: ``preferred`` first, recently throttled ones skipped."""
+        now = time.monotonic()
+        order = [preferred] + [c for c in _PLAYER_CLIENTS if c != preferred]
+        usable = [c for c in order if self._throttled_until.get(c, 0.0) <= now]
+        # With every client cooling down, still try them all rather than fail without a request.
+        return usable or order
+
+    def _mark_client_throttled(self, client: Optional[str]) -> None:
+        self._throttled_until[client] = time.monotonic() + _CLIENT_THROTTLE_TTL_SECONDS
+
+    def _get_owner_lock(self, owner_id: Optional[str]) -> asyncio.Lock:
+        # No await between lookup and insert, so this is atomic on the event loop without a guard lock.
         key = (owner_id or "__unknown__").strip() or "__unknown__"
-        async with self._owner_download_locks_guard:
-            lock = self._owner_download_locks.get(key)
-            if lock is None:
-                lock = asyncio.Lock()
-                self._owner_download_locks[key] = lock
-            return lock
+        lock = self._owner_download_locks.get(key)
+        if lock is None:
+            lock = self._owner_download_locks.setdefault(key, asyncio.Lock())
+        return lock
+
+    async def _fetch_cookie_url(self, cookie_url: str) -> bytes:
+        if not _HTTP_URL_RE.match(cookie_url):
+            raise RuntimeError("YTDLP_COOKIES_URL must start with http:// or https://")
+        too_large = False
+        chunks: List[bytes] = []
+        try:
+            # Async so a slow cookie host doesn't stall every other task on the event loop; being an
+            # await, it is also abandoned promptly when the task is cancelled.
+            async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
+                async with client.stream("GET", cookie_url) as resp:
+                    resp.raise_for_status()
+                    received = 0
+                    # Streamed so an oversized response is dropped at the cap rather than fully buffered.
+                    async for chunk in resp.aiter_bytes(65536):
+                        received += len(chunk)
+                        if received > _COOKIE_FILE_MAX_BYTES:
+                            too_large = True
+                            break
+                        chunks.append(chunk)
+        except Exception as e:  # noqa: BLE001
+            raise RuntimeError("Failed to fetch cookies from YTDLP_COOKIES_URL") from e
+
+        if too_large:
+            raise RuntimeError("Cookies file too large")
+        return b"".join(chunks)
+
+    @staticmethod
+    def _decode_cookie_b64(cookie_b64: str) -> bytes:
+        try:
+            return base64.b64decode(cookie_b64.encode("utf-8"), validate=True)
+        except Exception as e:  # noqa: BLE001
+            raise RuntimeError("Invalid YTDLP_COOKIES_B64 (must be base64)") from e
+
+    async def _load_cookie_bytes(self) -> Optional[bytes]:
+        """Return cookies.txt contents from YTDLP_COOKIES_URL or YTDLP_COOKIES_B64, if configured."""
+
+        cookie_b64 = cast(str, getattr(self._settings, "YTDLP_COOKIES_B64", "") or "").strip()
+        cookie_url = cast(str, getattr(self._settings, "YTDLP_COOKIES_URL", "") or "").strip()
+
+        if not (cookie_url or cookie_b64):
+            return None
+
+        key = cookie_url or cookie_b64
+        async with self._cookie_cache_lock:
+            cached = self._cookie_cache
+            if cached is not None and cached[0] == key and cached[1] > time.monotonic():
+                return cached[2]
+            raw = await self._fetch_cookie_url(cookie_url) if cookie_url else self._decode_cookie_b64(cookie_b64)
+            self._cookie_cache = (key, time.monotonic() + _COOKIE_CACHE_TTL_SECONDS, raw)
+            return raw
 
-    @contextmanager
-    def _yt_dlp_cookiefile(self):
-        """Yield a cookies.txt path for yt-dlp, if configured.
+    def _invalidate_cookie_cache(self) -> None:
+        """Refetch cookies on next use (e.g. after a sign-in/bot check suggests they went stale)."""
+        self._cookie_cache = None
+
+    @asynccontextmanager
+    async def _yt_dlp_cookiefile(self):
+        """Yield a cookies.txt path or in-memory cookies.txt for yt-dlp, if configured.
 
         Supports:
         - YTDLP_COOKIES_PATH: path to a cookies.txt file inside the container
@@ -55,64 +280,20 @@ class DownloadService:
         """
 
         cookie_path = cast(str, getattr(self._settings, "YTDLP_COOKIES_PATH", "") or "")
-        cookie_b64 = cast(str, getattr(self._settings, "YTDLP_COOKIES_B64", "") or "")
-        cookie_url = cast(str, getattr(self._settings, "YTDLP_COOKIES_URL", "") or "")
-
         if cookie_path:
             yield cookie_path
             return
 
-        if cookie_url:
-            if not re.match(r"^https?://", cookie_url.strip(), flags=re.IGNORECASE):
-                raise RuntimeError("YTDLP_COOKIES_URL must start with http:// or https://")
-
-            try:
-                import requests
-
-                resp = requests.get(cookie_url, timeout=20)
-                resp.raise_for_status()
-                raw = resp.content
-            except Exception as e:  # noqa: BLE001
-                raise RuntimeError("Failed to fetch cookies from YTDLP_COOKIES_URL") from e
-
-            if len(raw) > 5_000_000:
-                raise RuntimeError("Cookies file too large")
-
-            tmp = tempfile.NamedTemporaryFile(mode="wb", delete=False, suffix=".txt")
-            try:
-                tmp.write(raw)
-                tmp.flush()
-                tmp.close()
-                yield tmp.name
-            finally:
-                try:
-                    os.unlink(tmp.name)
-                except OSError:
-                    pass
-            return
-
-        if cookie_b64:
-            try:
-                raw = base64.b64decode(cookie_b64.encode("utf-8"), validate=True)
-            except Exception as e:  # noqa: BLE001
-                raise RuntimeError("Invalid YTDLP_COOKIES_B64 (must be base64)") from e
-
-            tmp = tempfile.NamedTemporaryFile(mode="wb", delete=False, suffix=".txt")
-            try:
-                tmp.write(raw)
-                tmp.flush()
-                tmp.close()
-                yield tmp.name
-            finally:
-                try:
-                    os.unlink(tmp.name)
-                except OSError:
-                    pass
+        raw = await self._load_cookie_bytes()
+        if raw is None:
+            yield None
             return
 
-        yield None
+        # yt-dlp accepts a file object as cookiefile. An in-memory buffer per use avoids a temp
+        # file round-trip, and stays private because yt-dlp writes its cookie jar back on exit.
+        yield io.StringIO(raw.decode("utf-8", errors="replace"))
 
-    def _prepare_cookie_file_for_task(self, base_dir: Path) -> Optional[str]:
+    async def _prepare_cookie_file_for_task(self, base_dir: Path) -> Optional[str]:
         """Prepare a persistent cookies.txt file for the duration of a task.
 
         This is primarily used for subprocess-based downloads (spotdl) where we
@@ -122,42 +303,17 @@ class DownloadService:
         """
 
         cookie_path = cast(str, getattr(self._settings, "YTDLP_COOKIES_PATH", "") or "").strip()
-        cookie_b64 = cast(str, getattr(self._settings, "YTDLP_COOKIES_B64", "") or "").strip()
-        cookie_url = cast(str, getattr(self._settings, "YTDLP_COOKIES_URL", "") or "").strip()
-
         if cookie_path:
             return cookie_path
 
-        if cookie_url:
-            if not re.match(r"^https?://", cookie_url, flags=re.IGNORECASE):
-                raise RuntimeError("YTDLP_COOKIES_URL must start with http:// or https://")
-            try:
-                import requests
-
-                resp = requests.get(cookie_url, timeout=20)
-                resp.raise_for_status()
-                raw = resp.content
-            except Exception as e:  # noqa: BLE001
-                raise RuntimeError("Failed to fetch cookies from YTDLP_COOKIES_URL") from e
-
-            if len(raw) > 5_000_000:
-                raise RuntimeError("Cookies file too large")
-
-            target = base_dir / "cookies.txt"
-            target.write_bytes(raw)
-            return str(target)
-
-        if cookie_b64:
-            try:
-                raw = base64.b64decode(cookie_b64.encode("utf-8"), validate=True)
-            except Exception as e:  # noqa: BLE001
-                raise RuntimeError("Invalid YTDLP_COOKIES_B64 (must be base64)") from e
-
-            target = base_dir / "cookies.txt"
-            target.write_bytes(raw)
-            return str(target)
+        raw = await self._load_cookie_bytes()
+        if raw is None:
+            return None
 
-        return None
+        target = base_dir / "cookies.txt"
+        # The fsync can block for a while on network disks; keep it off the event loop.
+        await asyncio.to_thread(_write_file_atomic, target, raw)
+        return str(target)
 
     def _resolve_browser_cookie_source(self) -> Optional[str]:
         """
@@ -165,6 +321,11 @@ class DownloadService:
         If config is 'auto', it tests common browsers.
         Returns the browser name (e.g. 'chrome') or None.
         """
+        return self._browser_cookie_source
+
+    @cached_property
+    def _browser_cookie_source(self) -> Optional[str]:
+        # Installed browsers don't change while the service runs; probe the filesystem once.
         configured = cast(str, getattr(self._settings, "YTDLP_COOKIES_BROWSER", "") or "").strip()
         if not configured:
             return None
@@ -197,9 +358,9 @@ class DownloadService:
         candidates = ["chrome", "edge", "firefox"]
         if os.name == 'nt': # Windows
             local_app_data = os.environ.get('LOCALAPPDATA', '')
-            if 'chrome' in candidates and os.path.exists(os.path.join(local_app_data, r'Google\Chrome\User Data')):
+            if 'chrome' in candidates and os.path.exists(os.path.join(local_app_data, _WIN_CHROME_PROFILE_DIR)):
                 return 'chrome'
-            if 'edge' in candidates and os.path.exists(os.path.join(local_app_data, r'Microsoft\Edge\User Data')):
+            if 'edge' in candidates and os.path.exists(os.path.join(local_app_data, _WIN_EDGE_PROFILE_DIR)):
                 return 'edge'
             # fallback
             return 'chrome' 
@@ -234,18 +395,25 @@ class DownloadService:
 
     
     def _get_proxy(self) -> Optional[str]:
-        """Get a random proxy from the configuration pool."""
-        raw_proxy = cast(str, getattr(self._settings, "YTDLP_PROXY", "") or "")
-        if not raw_proxy:
-            return None
-        # Support comma-separated list for rotation
-        proxies = [p.strip() for p in raw_proxy.split(",") if p.strip()]
-        if not proxies:
-            return None
-        return random.choice(proxies)
-
-    def _apply_yt_dlp_runtime_opts(self, ydl_opts: Dict[str, Any], cookiefile: Optional[str], override_client: Optional[str] = None):
-        """Mutate yt-dlp options with runtime settings (cookies/headers/extractor tweaks)."""
+        """Get a random proxy from the configuration pool (comma-separated YTDLP_PROXY)."""
+        return random.choice(self._proxy_pool) if self._proxy_pool else None
+
+    @staticmethod
+    def _youtube_extractor_args(ydl_opts: Dict[str, Any]) -> Dict[str, Any]:
+        # Plain lookups instead of setdefault(key, {}), which builds a throwaway dict when the key exists.
+        extractor_args = ydl_opts.get("extractor_args")
+        if extractor_args is None:
+            extractor_args = ydl_opts["extractor_args"] = {}
+        youtube_args = extractor_args.get("youtube")
+        if youtube_args is None:
+            youtube_args = extractor_args["youtube"] = {}
+        return cast(Dict[str, Any], youtube_args)
+
+    def _apply_yt_dlp_runtime_opts(self, ydl_opts: Dict[str, Any], cookiefile: Optional[Union[str, IO[str]]], override_client: Optional[str] = None, proxy: Optional[str] = None):
+        """Mutate yt-dlp options with runtime settings (cookies/headers/extractor tweaks).
+
+        ``proxy`` pins the proxy (callers that pool instances per proxy); otherwise one is drawn from the pool.
+        """
 
         cookies_browser = self._resolve_browser_cookie_source()
         if cookies_browser:
@@ -256,66 +424,103 @@ class DownloadService:
 
         # Client Rotation Strategy
         # If override is provided (from retry loop), use it. Else use config default.
-        player_client = override_client or cast(str, getattr(self._settings, "YTDLP_YOUTUBE_PLAYER_CLIENT", "") or "")
+        yt = self._yt_opts
+        player_client = override_client or yt.player_client
         
         if player_client:
-            extractor_args = cast(Dict[str, Any], ydl_opts.setdefault("extractor_args", {}))
-            youtube_args = cast(Dict[str, Any], extractor_args.setdefault("youtube", {}))
-            youtube_args["player_client"] = [player_client]
+            self._youtube_extractor_args(ydl_opts)["player_client"] = [player_client]
 
-        proxy = self._get_proxy()
+        proxy = proxy or self._get_proxy()
         if proxy:
             ydl_opts["proxy"] = proxy
 
-        po_token = cast(str, getattr(self._settings, "YTDLP_PO_TOKEN", "") or "")
-        po_provider = cast(str, getattr(self._settings, "YTDLP_PO_PROVIDER", "web"))
-        if po_token:
-            extractor_args = cast(Dict[str, Any], ydl_opts.setdefault("extractor_args", {}))
-            youtube_args = cast(Dict[str, Any], extractor_args.setdefault("youtube", {}))
-            youtube_args["po_token"] = [f"{po_provider}+{po_token}"]
+        if yt.po_token:
+            self._youtube_extractor_args(ydl_opts)["po_token"] = [f"{yt.po_provider}+{yt.po_token}"]
 
-        if cast(bool, getattr(self._settings, "YTDLP_USE_OAUTH", False)):
-            ydl_opts["username"] = "oauth2"
-            ydl_opts["password"] = ""
+        # Config-only options, resolved once at init; installs that set none of them pay nothing here.
+        if self._static_ydl_opts:
+            ydl_opts.update(self._static_ydl_opts)
 
         # User-Agent Rotation (Real Data simulation)
-        headers = cast(Dict[str, Any], ydl_opts.setdefault("http_headers", {}))
-        
+        headers = ydl_opts.get("http_headers")
+        if headers is None:
+            headers = ydl_opts["http_headers"] = {}
+
         # Pick a random "Real" User-Agent if not explicitly set in headers
         if "User-Agent" not in headers:
-            agents = getattr(self._settings, "REAL_USER_AGENTS", [])
-            if agents:
-                 headers["User-Agent"] = random.choice(agents)
-            else:
-                 # Fallback default
-                 headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+            headers["User-Agent"] = random.choice(self._user_agents)
+        if "Accept-Language" not in headers:
+            headers["Accept-Language"] = "en-US,en;q=0.9"
 
-        headers.setdefault("Accept-Language", "en-US,en;q=0.9")
+        return ydl_opts
 
-        # Gentle pacing to reduce cloud-IP throttling.
-        # These options are supported by yt-dlp and help on hosts where YouTube is aggressive.
-        sleep_interval = float(getattr(self._settings, "YTDLP_SLEEP_INTERVAL", 0) or 0)
-        max_sleep_interval = float(getattr(self._settings, "YTDLP_MAX_SLEEP_INTERVAL", 0) or 0)
-        sleep_interval_requests = int(getattr(self._settings, "YTDLP_SLEEP_INTERVAL_REQUESTS", 0) or 0)
-        if sleep_interval > 0:
-            ydl_opts["sleep_interval"] = sleep_interval
-        if max_sleep_interval > 0:
-            ydl_opts["max_sleep_interval"] = max_sleep_interval
-        if sleep_interval_requests > 0:
-            ydl_opts["sleep_interval_requests"] = sleep_interval_requests
+    def _build_spotify_payload(self, url: str) -> Tuple[str, List[Dict[str, Any]], Optional[str], int]:
+        """Fetch Spotify metadata and tracks and build the track list; returns (title, tracks, cover_url, skipped).
 
-        # Retries help on shared cloud IPs where YouTube rate-limits aggressively.
-        retries = int(getattr(self._settings, "YTDLP_RETRIES", 0) or 0)
-        fragment_retries = int(getattr(self._settings, "YTDLP_FRAGMENT_RETRIES", 0) or 0)
-        extractor_retries = int(getattr(self._settings, "YTDLP_EXTRACTOR_RETRIES", 0) or 0)
-        if retries > 0:
-            ydl_opts["retries"] = retries
-        if fragment_retries > 0:
-            ydl_opts["fragment_retries"] = fragment_retries
-        if extractor_retries > 0:
-            ydl_opts["extractor_retries"] = extractor_retries
+        Blocking; runs as a single executor job so the whole ingestion costs one thread hop.
+        """
+        data, type_ = self._spotify.get_metadata(url)
 
-        return ydl_opts
+        track_list: List[Dict[str, Any]] = []
+        title = cast(str, data.get("name") or "Unknown")
+        images = data.get("images") if isinstance(data, dict) else None
+        cover_url = None
+        if isinstance(images, list) and images:
+            first_img = images[0]
+            if isinstance(first_img, dict):
+                cover_url = first_img.get("url")
+
+        skipped = 0
+
+        append_track = track_list.append
+
+        def add_track(i: int, t: Any):
+            nonlocal skipped
+            # One guard for malformed items (non-dict entries, missing/empty artists, etc.)
+            # instead of an isinstance check per field.
+            try:
+                name = t["name"]
+                artist_name = t["artists"][0]["name"]
+                track_url = t["external_urls"]["spotify"]
+                is_local = t.get("is_local") is True
+            except (KeyError, TypeError, IndexError, AttributeError):
+                skipped += 1
+                return
+            if is_local or not (name and artist_name and track_url):
+                skipped += 1
+                return
+
+            append_track(
+                {
+                    "id": str(i),
+                    "title": cast(str, name),
+                    "artist": cast(str, artist_name),
+                    "url": cast(str, track_url),
+                    "status": "pending",
+                }
+            )
+
+        if type_ == "playlist":
+            playlist_id = data.get("id")
+            if not playlist_id:
+                raise ValueError("Spotify playlist metadata missing 'id'")
+            tracks_data = self._spotify.get_playlist_tracks(cast(str, playlist_id))
+            for i, t in enumerate(tracks_data):
+                add_track(i, t)
+        elif type_ == "album":
+            tracks_obj = data.get("tracks") if isinstance(data, dict) else None
+            tracks_items = tracks_obj.get("items") if isinstance(tracks_obj, dict) else None
+            if not isinstance(tracks_items, list):
+                raise ValueError("Spotify album metadata missing tracks")
+            for i, t in enumerate(tracks_items):
+                add_track(i, t)
+        elif type_ == "track":
+            if not isinstance(data, dict):
+                raise ValueError("Spotify track metadata invalid")
+            title = cast(str, data.get("name") or title)
+            add_track(0, data)
+
+        return title, track_list, cover_url, skipped
 
     async def fetch_playlist_info(self, task_id: str, url: str):
         """Fetch metadata and write the 'ready' playlist structure to DB."""
@@ -326,85 +531,9 @@ class DownloadService:
             loop = asyncio.get_running_loop()
 
             if "spotify.com" in url or url.startswith("spotify:"):
-                data, type_ = await loop.run_in_executor(None, lambda: self._spotify.get_metadata(url))
-
-                track_list: List[Dict[str, Any]] = []
-                title = cast(str, data.get("name") or "Unknown")
-                images = data.get("images") if isinstance(data, dict) else None
-                cover_url = None
-                if isinstance(images, list) and images:
-                    first_img = images[0]
-                    if isinstance(first_img, dict):
-                        cover_url = first_img.get("url")
-
-                skipped = 0
-
-                def add_track(i: int, t: Dict[str, Any]):
-                    nonlocal skipped
-                    name = t.get("name")
-                    if not name:
-                        skipped += 1
-                        return
-
-                    if t.get("is_local") is True:
-                        skipped += 1
-                        return
-
-                    artists = t.get("artists")
-                    artist_name = None
-                    if isinstance(artists, list) and artists:
-                        a0 = artists[0]
-                        if isinstance(a0, dict):
-                            artist_name = a0.get("name")
-                    if not artist_name:
-                        skipped += 1
-                        return
-
-                    ext = t.get("external_urls")
-                    track_url = None
-                    if isinstance(ext, dict):
-                        track_url = ext.get("spotify")
-                    if not track_url:
-                        skipped += 1
-                        return
-
-                    track_list.append(
-                        {
-                            "id": str(i),
-                            "title": cast(str, name),
-                            "artist": cast(str, artist_name),
-                            "url": cast(str, track_url),
-                            "status": "pending",
-                        }
-                    )
-
-                if type_ == "playlist":
-                    playlist_id = data.get("id")
-                    if not playlist_id:
-                        raise ValueError("Spotify playlist metadata missing 'id'")
-                    tracks_data = await loop.run_in_executor(
-                        None, lambda: self._spotify.get_playlist_tracks(cast(str, playlist_id))
-                    )
-                    for i, t in enumerate(tracks_data):
-                        if isinstance(t, dict):
-                            add_track(i, t)
-                        else:
-                            skipped += 1
-                elif type_ == "album":
-                    tracks_obj = data.get("tracks") if isinstance(data, dict) else None
-                    tracks_items = tracks_obj.get("items") if isinstance(tracks_obj, dict) else None
-                    if not isinstance(tracks_items, list):
-                        raise ValueError("Spotify album metadata missing tracks")
-                    for i, t in enumerate(tracks_items):
-                        if isinstance(t, dict):
-                            add_track(i, t)
-                        else:
-                            skipped += 1
-                elif type_ == "track":
-                    if not isinstance(data, dict):
-                        raise ValueError("Spotify track metadata invalid")
-                    title = cast(str, data.get("name") or title)
-                    add_track(0, data)
+                title, track_list, cover_url, skipped = await loop.run_in_executor(
+                    None, self._build_spotify_payload, url
+                )
 
                 if len(track_list) == 0:
                     raise ValueError(
@@ -415,8 +544,9 @@ class DownloadService:
                 if skipped > 0:
                     ready_message = f"Ready to download (skipped {skipped} unavailable/local tracks)"
 
-                update = {
-                    "playlist": {
+                await self._db.update_playlist_fields(
+                    task_id,
+                    {
                         "title": title,
                         "provider": "spotify",
                         "tracks": track_list,
@@ -424,24 +554,22 @@ class DownloadService:
                         "cover_url": cover_url,
                         "thumbnail": cover_url,
                     },
-                    "status": "ready",
-                    "message": ready_message,
-                }
-                current_task = await self._db.get_task(task_id)
-                if current_task:
-                    current_task.update(update)
-                    await self._db.save_full_task_state(task_id, current_task)
+                    status="ready",
+                    message=ready_message,
+                )
                 return
 
             # Non-Spotify: use yt-dlp metadata extraction
-            def get_info():
-                with self._yt_dlp_cookiefile() as cookiefile:
+            # Cookies are fetched on the event loop first; the executor thread only runs yt-dlp.
+            async with self._yt_dlp_cookiefile() as cookiefile:
+
+                def get_info():
                     ydl_opts = cast(Any, {"extract_flat": "in_playlist", "dump_single_json": True, "quiet": True})
                     self._apply_yt_dlp_runtime_opts(cast(Dict[str, Any], ydl_opts), cookiefile)
                     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                         return ydl.extract_info(url, download=False)
 
-            info = await loop.run_in_executor(None, get_info)
+                info = await loop.run_in_executor(None, get_info)
             if not info:
                 raise Exception("Could not fetch info")
 
@@ -464,8 +592,9 @@ class DownloadService:
                     }
                 )
 
-            update = {
-                "playlist": {
+            await self._db.update_playlist_fields(
+                task_id,
+                {
                     "title": title,
                     "provider": "youtube",
                     "tracks": track_list,
@@ -473,13 +602,9 @@ class DownloadService:
                     "cover_url": info.get("thumbnail"),
                     "thumbnail": info.get("thumbnail"),
                 },
-                "status": "ready",
-                "message": "Ready to download",
-            }
-            current_task = await self._db.get_task(task_id)
-            if current_task:
-                current_task.update(update)
-                await self._db.save_full_task_state(task_id, current_task)
+                status="ready",
+                message="Ready to download",
+            )
 
         except KeyError as e:
             missing_key = e.args[0] if e.args else "<unknown>"
@@ -510,7 +635,7 @@ class DownloadService:
 
             task_state: Dict[str, Any] = cast(Dict[str, Any], task)
 
-            owner_lock = await self._get_owner_lock(cast(Optional[str], task_state.get("owner_id")))
+            owner_lock = self._get_owner_lock(cast(Optional[str], task_state.get("owner_id")))
 
             options = task_state.get("options") or {}
             if options.get("cancel_requested") is True:
@@ -535,25 +660,19 @@ class DownloadService:
                     if (now2 - cancel_last_check) < 1.0:
                         return cancel_cached
 
-                    latest = await self._db.get_task(task_id)
-                    latest_options = (latest or {}).get("options") or {}
-                    cancel_cached = latest_options.get("cancel_requested") is True
+                    # Narrow read of the flag; doesn't force out buffered progress writes.
+                    cancel_cached = await self._db.is_cancel_requested(task_id)
                     cancel_last_check = now2
                     return cancel_cached
 
-            acquired_immediately = False
-            try:
-                await asyncio.wait_for(owner_lock.acquire(), timeout=0.001)
-                acquired_immediately = True
-            except asyncio.TimeoutError:
-                acquired_immediately = False
-
-            if not acquired_immediately:
+            # Check-then-acquire (no await in between) instead of a timed acquire: cancelling a
+            # wait_for'd acquire can leave the lock held with nobody to release it.
+            if owner_lock.locked():
                 task_state["status"] = "queued"
                 task_state["message"] = "Queued for download..."
                 task_state["progress"] = float(task_state.get("progress") or 0)
                 await self._db.save_full_task_state(task_id, task_state)
-                await owner_lock.acquire()
+            await owner_lock.acquire()
 
             try:
                 task = await self._db.get_task(task_id)
@@ -574,19 +693,18 @@ class DownloadService:
 
                 selected = options.get("selected_indices")
                 if selected is not None:
-                    tracks = [t for i, t in enumerate(all_tracks) if i in selected or str(i) in map(str, selected)]
+                    # Indices may arrive as ints or strings; normalise once rather than per track.
+                    selected_keys = {str(x) for x in selected}
+                    tracks = [t for i, t in enumerate(all_tracks) if str(i) in selected_keys]
                     if not tracks:
                         tracks = all_tracks
                 else:
                     tracks = all_tracks
 
                 for i, t in enumerate(tracks, start=1):
-                    if isinstance(t, dict):
-                        t["_download_index"] = i
-
-                for t in tracks:
                     if not isinstance(t, dict):
                         continue
+                    t["_download_index"] = i
                     if t.get("status") in (None, "pending", "ready"):
                         t["status"] = "queued"
                     if t.get("progress") is None:
@@ -599,21 +717,23 @@ class DownloadService:
                 last_progress_save = 0.0
                 SAVE_INTERVAL_SECONDS = 1.0
 
+                # Running totals, kept in step by set_track_status, so progress updates don't rescan every track.
+                done = sum(1 for t in tracks if t.get("status") in ("completed", "error"))
+                failed = sum(1 for t in tracks if t.get("status") == "error")
+
+                def set_track_status(track: Dict[str, Any], new_status: str) -> None:
+                    nonlocal done, failed
+                    prev_status = track.get("status")
+                    done += (new_status in ("completed", "error")) - (prev_status in ("completed", "error"))
+                    failed += (new_status == "error") - (prev_status == "error")
+                    track["status"] = new_status
+
                 async def update_overall_progress(force: bool = False):
                     nonlocal last_progress_save
                     if total_tracks <= 0:
                         return
 
                     async with progress_lock:
-                        done = 0
-                        failed = 0
-                        for t in tracks:
-                            s = t.get("status")
-                            if s in ("completed", "error"):
-                                done += 1
-                            if s == "error":
-                                failed += 1
-
                         task_state["progress"] = round((done / total_tracks) * 85.0, 2)
                         if failed > 0:
                             task_state["message"] = f"Downloading {done}/{total_tracks} (failed: {failed})"
@@ -634,8 +754,6 @@ class DownloadService:
 
                 import tempfile
 
-                audio_exts = {".mp3", ".m4a", ".flac", ".wav", ".opus", ".ogg"}
-
                 with tempfile.TemporaryDirectory() as temp_dir_str:
                     base_dir = Path(temp_dir_str)
                     safe_title = sanitize_filename(playlist["title"]) or f"download_{task_id}"
@@ -647,11 +765,23 @@ class DownloadService:
                     active_browser_source = self._resolve_browser_cookie_source()
 
                     # Prepare a persistent cookie file for subprocess usage (spotdl)
-                    cookie_file_for_task = self._prepare_cookie_file_for_task(base_dir)
+                    cookie_file_for_task = await self._prepare_cookie_file_for_task(base_dir)
 
                     has_cookie_config = bool(cookie_file_for_task or active_browser_source)
 
-                    def download_spotify_subprocess(url: str, output_template: str, override_client: Optional[str] = None, user_agent: Optional[str] = None):
+                    # The child environment is the same for every spotdl run in this task.
+                    spotdl_env = {
+                        **os.environ,
+                        "SPOTIPY_CLIENT_ID": self._settings.SPOTIFY_CLIENT_ID,
+                        "SPOTIPY_CLIENT_SECRET": self._settings.SPOTIFY_CLIENT_SECRET,
+                    }
+
+                    async def download_spotify_subprocess(url: str, output_template: str, override_client: Optional[str] = None, user_agent: Optional[str] = None):
+                        if not spotdl_env["SPOTIPY_CLIENT_ID"] or not spotdl_env["SPOTIPY_CLIENT_SECRET"]:
+                            raise RuntimeError(
+                                "Spotify downloads require SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET to be set"
+                            )
+
                         # Construct yt-dlp args for spotdl
                         # We need to pass proxy, cookies, and PO token
                         
@@ -747,65 +877,87 @@ class DownloadService:
                         ]
                         
                         if yt_dlp_args:
-                            # Pass as a single string to --yt-dlp-args if needed, or see if spotdl accepts them directly?
-                            # spotdl --yt-dlp-args "ARGS"
-                            # We need to construct the string carefully.
-                            # Example: --yt-dlp-args "--proxy http://... --extractor-args youtube:..."
-                            
-                            # Naive join might break if args have spaces, but ours (proxy/po token) typically don't.
-                            flat_args = " ".join(yt_dlp_args)  
+                            # spotdl takes a single string and shlex-splits it, so quote each arg:
+                            # the user agent (and possibly a cookies path) contains spaces.
+                            flat_args = shlex.join(yt_dlp_args)
                             cmd.extend(["--yt-dlp-args", flat_args])
 
-                        env = os.environ.copy()
-                        env["SPOTIPY_CLIENT_ID"] = self._settings.SPOTIFY_CLIENT_ID
-                        env["SPOTIPY_CLIENT_SECRET"] = self._settings.SPOTIFY_CLIENT_SECRET
-
-                        if not env.get("SPOTIPY_CLIENT_ID") or not env.get("SPOTIPY_CLIENT_SECRET"):
-                            raise RuntimeError(
-                                "Spotify downloads require SPOTIFY_CLIENT_ID and SPOTIFY_CLIENT_SECRET to be set"
-                            )
-
+                        proc = await asyncio.create_subprocess_exec(
+                            *cmd,
+                            stdout=asyncio.subprocess.PIPE,
+                            stderr=asyncio.subprocess.STDOUT,
+                            env=spotdl_env,
+                            cwd=str(download_dir),
+                        )
+                        stdout = cast(asyncio.StreamReader, proc.stdout)
+                        # Output is streamed and only a bounded tail kept for error messages. A large
+                        # track only times out if spotdl goes quiet, not because it takes long overall.
+                        output_tail: deque[bytes] = deque(maxlen=_SPOTDL_TAIL_CHUNKS)
                         try:
-                            subprocess.run(
-                                cmd,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                text=True,
-                                env=env,
-                                encoding="utf-8",
-                                errors="replace",
-                                check=True,
-                                cwd=str(download_dir),
-                                timeout=300,
-                            )
-                        except subprocess.TimeoutExpired as e:
-                            raise RuntimeError("spotdl timed out (300s)") from e
-                        except subprocess.CalledProcessError as e:
-                            stderr = (getattr(e, "stderr", None) or "").strip()
-                            stdout = (getattr(e, "stdout", None) or "").strip()
-                            combined = "\n".join([s for s in [stderr, stdout] if s])
+                            while True:
+                                chunk = await asyncio.wait_for(stdout.read(4096), timeout=_SPOTDL_IDLE_TIMEOUT_SECONDS)
+                                if not chunk:
+                                    break
+                                output_tail.append(chunk)
+                            returncode = await proc.wait()
+                        except asyncio.TimeoutError as e:
+                            raise RuntimeError(f"spotdl timed out (no output for {_SPOTDL_IDLE_TIMEOUT_SECONDS:.0f}s)") from e
+                        finally:
+                            if proc.returncode is None:
+                                proc.kill()
+                                await proc.wait()
+
+                        if returncode != 0:
+                            combined = b"".join(output_tail).decode("utf-8", errors="replace").strip()
                             tail = combined[-800:] if combined else ""
-                            msg = f"spotdl failed (exit {getattr(e, 'returncode', 'unknown')})"
+                            msg = f"spotdl failed (exit {returncode})"
                             if tail:
                                 msg = f"{msg}: {tail}"
-                            raise RuntimeError(msg) from e
+                            raise RuntimeError(msg)
+
+                    # Idle YoutubeDL instances per (player client, proxy) for the yt-dlp path. An instance
+                    # is checked out by one worker at a time, so concurrent downloads never share one.
+                    # The proxy is part of the key because yt-dlp binds it when the instance is built.
+                    ydl_pool: Dict[Tuple[Optional[str], Optional[str]], List[Any]] = {}
+                    # Bumped when cookies go stale; instances checked out before that aren't pooled again.
+                    ydl_generation = 0
+
+                    def drop_pooled_instances() -> None:
+                        nonlocal ydl_generation
+                        ydl_generation += 1
+                        for idle in ydl_pool.values():
+                            for stale in idle:
+                                stale.close()
+                        ydl_pool.clear()
+                    # Audio files already attributed to a track, so each worker only walks the
+                    # directory once after its download instead of before and after.
+                    known_audio: set[Path] = set()
+
+                    def claim_new_audio() -> Dict[Path, float]:
+                        # Paths -> mtime from the walk itself, so callers never stat a file again.
+                        new = {p: m for p, m in _scan_audio_files(download_dir).items() if p not in known_audio}
+                        known_audio.update(new)
+                        return new
+
+                    # Player client that last succeeded in this task; later tracks try it first.
+                    last_good_client: Optional[str] = None
 
                     async def download_worker(track: Dict[str, Any]):
+                        nonlocal last_good_client
                         async with self._files_semaphore:
                             try:
                                 if await should_cancel():
-                                    track["status"] = "cancelled"
+                                    set_track_status(track, "cancelled")
                                     track["progress"] = 0
                                     await update_overall_progress()
                                     return
 
                                 await asyncio.sleep(0.1)
-                                track["status"] = "downloading"
+                                set_track_status(track, "downloading")
                                 track["progress"] = 0
 
-                                # Snapshot existing audio files so we can confirm a new one was produced.
-                                before_audio = {p.resolve() for p in download_dir.rglob("*") if p.is_file() and p.suffix.lower() in audio_exts}
                                 start_ts = time.time()
+                                after_audio: Dict[Path, float] = {}
 
                                 if playlist["provider"] == "spotify":
                                     if not track.get("url"):
@@ -817,50 +969,45 @@ class DownloadService:
                                     use_spotdl = bool(getattr(self._settings, "SPOTIFY_USE_SPOTDL", False))
 
                                     # Default: avoid spotdl (more reliable on shared/cloud IPs)
-                                    after_audio: list[Path] = []
-
                                     if use_spotdl:
                                         # spotdl expects --output to be a directory or a template.
                                         # Using a directory is the most reliable across versions.
                                         output_dir = safe_download_str
 
                                         # CLIENT ROTATION FOR SPOTDL
-                                        clients_to_try_sp = [None, "ios", "android", "web", "tv"]
+                                        clients_to_try_sp = self._client_rotation(last_good_client)
                                         success_sp = False
                                         last_error_sp = ""
 
-                                        for attempt_client_sp in clients_to_try_sp:
+                                        for attempt_idx, attempt_client_sp in enumerate(clients_to_try_sp):
                                             try:
                                                 # Provide UI feedback
-                                                if attempt_client_sp:
+                                                if attempt_idx:
                                                     track["error"] = f"Bot check. Rotating client... (trying {attempt_client_sp})"
                                                     await update_overall_progress(force=True)
 
                                                 # Pick a random User-Agent for this attempt
-                                                current_ua = random.choice(getattr(self._settings, "REAL_USER_AGENTS", [])) if getattr(self._settings, "REAL_USER_AGENTS", []) else None
+                                                current_ua = random.choice(self._user_agents)
 
-                                                await loop.run_in_executor(
-                                                    None, lambda: download_spotify_subprocess(cast(str, track["url"]), output_dir, override_client=attempt_client_sp, user_agent=current_ua)
-                                                )
+                                                await download_spotify_subprocess(cast(str, track["url"]), output_dir, override_client=attempt_client_sp, user_agent=current_ua)
                                                 success_sp = True
+                                                last_good_client = attempt_client_sp
                                                 track["error"] = None  # Clear error on success
                                                 break
                                             except Exception as e:
                                                 msg = str(e)
-                                                if "confirm you" in msg or "bot" in msg or "429" in msg or "Sign in" in msg or "spotdl failed" in msg:
+                                                if _BOT_CHECK_RE.search(msg) or "spotdl failed" in msg:
                                                     logging.warning(f"SpotDL failed with client={attempt_client_sp}: {msg}")
+                                                    if _BOT_CHECK_RE.search(msg):
+                                                        self._mark_client_throttled(attempt_client_sp)
                                                     last_error_sp = msg
-                                                    attempt_idx = clients_to_try_sp.index(attempt_client_sp)
-                                                    delay = 2.0 * (attempt_idx + 1)
-                                                    await asyncio.sleep(delay)
+                                                    if attempt_idx + 1 < len(clients_to_try_sp):
+                                                        await asyncio.sleep(_rotation_backoff(attempt_idx))
                                                     continue
                                                 raise
 
                                         if success_sp:
-                                            after_audio = [
-                                                p for p in download_dir.rglob("*")
-                                                if p.is_file() and p.suffix.lower() in audio_exts and p.resolve() not in before_audio
-                                            ]
+                                            after_audio = claim_new_audio()
 
                                     # If spotdl is disabled or produced no file, use yt-dlp search for the track.
                                     if not after_audio:
@@ -868,17 +1015,17 @@ class DownloadService:
                                         out_tmpl = f"{safe_download_str}/{prefix}{safe_track_title}.%(ext)s"
                                         
                                         # CLIENT ROTATION FOR FALLBACK SEARCH
-                                        clients_to_try_fb = [None, "ios", "android", "web", "tv"]
+                                        clients_to_try_fb = self._client_rotation(last_good_client)
                                         success_fb = False
                                         last_error_fb = ""
 
-                                        for attempt_client_fb in clients_to_try_fb:
+                                        for attempt_idx, attempt_client_fb in enumerate(clients_to_try_fb):
                                             try:
-                                                if attempt_client_fb:
-                                                    track["error"] = f"Fallback search... (trying {attempt_client_fb})"
+                                                if attempt_idx:
+                                                    track["error"] = f"Fallback search... (trying {attempt_client_fb or 'default'})"
                                                     await update_overall_progress(force=True)
 
-                                                with self._yt_dlp_cookiefile() as cookiefile:
+                                                async with self._yt_dlp_cookiefile() as cookiefile:
                                                     ydl_opts = cast(
                                                         Any,
                                                         {
@@ -896,19 +1043,22 @@ class DownloadService:
                                                     self._apply_yt_dlp_runtime_opts(cast(Dict[str, Any], ydl_opts), cookiefile, override_client=attempt_client_fb)
                                                     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
                                                         await loop.run_in_executor(
-                                                            None, lambda: ydl.download([f"ytsearch1:{query}"])
+                                                            self._download_executor, lambda: ydl.download([f"ytsearch1:{query}"])
                                                         )
                                                 success_fb = True
+                                                last_good_client = attempt_client_fb
                                                 track["error"] = None
                                                 break
                                             except Exception as e:
                                                 msg = str(e)
-                                                if "confirm you" in msg or "bot" in msg or "429" in msg or "Sign in" in msg:
+                                                if _BOT_CHECK_RE.search(msg):
                                                     logging.warning(f"Fallback Search bot check failed with client={attempt_client_fb}. Rotating...")
+                                                    self._invalidate_cookie_cache()
+                                                    drop_pooled_instances()
+                                                    self._mark_client_throttled(attempt_client_fb)
                                                     last_error_fb = msg
-                                                    attempt_idx = clients_to_try_fb.index(attempt_client_fb)
-                                                    delay = 2.0 * (attempt_idx + 1)
-                                                    await asyncio.sleep(delay)
+                                                    if attempt_idx + 1 < len(clients_to_try_fb):
+                                                        await asyncio.sleep(_rotation_backoff(attempt_idx))
                                                     continue
                                                 else:
                                                     raise e
@@ -939,51 +1089,80 @@ class DownloadService:
                                     out_tmpl = str(download_dir / f"{ydl_tmpl}.%(ext)s")
                                     
                                     # CLIENT ROTATION LOGIC
-                                    # Try default -> ios -> android -> web -> tv
-                                    clients_to_try = [None, "ios", "android", "web", "tv"]
+                                    # Start from the client that last worked in this task, skipping ones
+                                    # YouTube recently throttled; otherwise default -> ios -> android -> web -> tv
+                                    clients_to_try = self._client_rotation(last_good_client)
                                     success = False
                                     last_error = ""
 
-                                    for attempt_client in clients_to_try:
+                                    for attempt_idx, attempt_client in enumerate(clients_to_try):
                                         try:
-                                            if attempt_client:
-                                                track["error"] = f"Bot check. Rotating client... (trying {attempt_client})"
+                                            if attempt_idx:
+                                                track["error"] = f"Bot check. Rotating client... (trying {attempt_client or 'default'})"
                                                 await update_overall_progress(force=True)
 
-                                            with self._yt_dlp_cookiefile() as cookiefile:
-                                                ydl_opts = cast(
-                                                    Any,
-                                                    {
-                                                        "format": "bestaudio/best",
-                                                        "outtmpl": out_tmpl,
-                                                        "postprocessors": [
-                                                            {"key": "FFmpegExtractAudio", "preferredcodec": codec}
-                                                        ],
-                                                        "writethumbnail": True,
-                                                        "addmetadata": True,
-                                                        "quiet": True,
-                                                        "ignoreerrors": False,
-                                                        "socket_timeout": 30,
-                                                    },
-                                                )
-                                                # Pass rotation client
-                                                self._apply_yt_dlp_runtime_opts(cast(Dict[str, Any], ydl_opts), cookiefile, override_client=attempt_client)
-                                                
-                                                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                                                    await loop.run_in_executor(
-                                                        None, lambda: ydl.download([cast(str, track["url"])])
+                                            # Options only vary by client and proxy within a task, so reuse an
+                                            # idle instance; the User-Agent is re-drawn per download either way.
+                                            proxy = self._get_proxy()
+                                            pool_key = (attempt_client, proxy)
+                                            ydl_gen = ydl_generation
+                                            idle = ydl_pool.get(pool_key)
+                                            if idle:
+                                                ydl = idle.pop()
+                                                # Read per request by yt-dlp, so this takes effect on a built instance.
+                                                ydl.params["http_headers"]["User-Agent"] = random.choice(self._user_agents)
+                                            else:
+                                                async with self._yt_dlp_cookiefile() as cookiefile:
+                                                    ydl_opts = cast(
+                                                        Any,
+                                                        {
+                                                            "format": "bestaudio/best",
+                                                            "outtmpl": out_tmpl,
+                                                            "postprocessors": [
+                                                                {"key": "FFmpegExtractAudio", "preferredcodec": codec}
+                                                            ],
+                                                            "writethumbnail": True,
+                                                            "addmetadata": True,
+                                                            "quiet": True,
+                                                            "ignoreerrors": False,
+                                                            "socket_timeout": 30,
+                                                        },
                                                     )
+                                                    # Pass rotation client
+                                                    self._apply_yt_dlp_runtime_opts(
+                                                        cast(Dict[str, Any], ydl_opts), cookiefile, override_client=attempt_client, proxy=proxy
+                                                    )
+                                                    ydl = yt_dlp.YoutubeDL(ydl_opts)
+
+                                            job = self._download_executor.submit(ydl.download, [cast(str, track["url"])])
+                                            try:
+                                                await asyncio.wrap_future(job)
+                                            except asyncio.CancelledError:
+                                                # The thread is still inside ydl.download(); close it once that returns.
+                                                job.add_done_callback(lambda _job, ydl=ydl: ydl.close())
+                                                raise
+                                            except Exception:
+                                                # A failed instance may hold stale cookies/session state; don't reuse it.
+                                                ydl.close()
+                                                raise
+                                            if ydl_gen == ydl_generation:
+                                                ydl_pool.setdefault(pool_key, []).append(ydl)
+                                            else:
+                                                ydl.close()
                                             success = True
+                                            last_good_client = attempt_client
                                             track["error"] = None
                                             break # Success!
                                         except Exception as e:
                                             msg = str(e)
-                                            if "confirm you" in msg or "bot" in msg or "429" in msg or "Sign in" in msg:
+                                            if _BOT_CHECK_RE.search(msg):
                                                 logging.warning(f"Bot check failed with client={attempt_client or 'default'}. Rotating...")
+                                                self._invalidate_cookie_cache()
+                                                drop_pooled_instances()
+                                                self._mark_client_throttled(attempt_client)
                                                 last_error = msg
-                                                attempt_idx = clients_to_try.index(attempt_client)
-                                                delay = 2.0 * (attempt_idx + 1)
-                                                await asyncio.sleep(delay)
+                                                if attempt_idx + 1 < len(clients_to_try):
+                                                    await asyncio.sleep(_rotation_backoff(attempt_idx))
                                                 continue # Try next client
                                             else:
                                                 raise e # Real error, re-raise
@@ -995,24 +1174,21 @@ class DownloadService:
                                              raise RuntimeError("Download failed (Rotated clients)")
 
                                 # Validate that an audio file was actually created.
-                                after_audio = [
-                                    p for p in download_dir.rglob("*")
-                                    if p.is_file() and p.suffix.lower() in audio_exts and p.resolve() not in before_audio
-                                ]
+                                if not after_audio:
+                                    after_audio = claim_new_audio()
                                 # Some tools may overwrite an existing file; in that case, accept a recently modified file.
                                 if not after_audio:
-                                    recent = [
-                                        p for p in download_dir.rglob("*")
-                                        if p.is_file() and p.suffix.lower() in audio_exts and p.stat().st_mtime >= (start_ts - 1)
-                                    ]
+                                    recent = {
+                                        p: mtime for p, mtime in _scan_audio_files(download_dir).items()
+                                        if mtime >= (start_ts - 1)
+                                    }
                                     after_audio = recent
 
                                 if not after_audio:
-                                    produced = [
-                                        p.name for p in sorted(download_dir.rglob("*"))
-                                        if p.is_file()
-                                    ]
-                                    preview = ", ".join(produced[:10])
+                                    # Top level is enough to diagnose; keep the first 10 names in sorted order.
+                                    with os.scandir(download_dir) as entries:
+                                        produced = heapq.nsmallest(10, (e.name for e in entries if e.is_file()))
+                                    preview = ", ".join(produced)
                                     extra = f" Produced files: {preview}" if preview else ""
                                     raise RuntimeError(f"Download step completed but no audio file was produced.{extra}")
 
@@ -1020,27 +1196,23 @@ class DownloadService:
                                 # (yt-dlp branch already controls the output name).
                                 if playlist["provider"] == "spotify" and after_audio:
                                     try:
-                                        newest = max(after_audio, key=lambda p: p.stat().st_mtime)
+                                        newest = max(after_audio, key=after_audio.__getitem__)
                                         desired = download_dir / f"{prefix}{safe_track_title}{newest.suffix}"
                                         if newest != desired and not desired.exists():
-                                            newest.replace(desired)
+                                            os.replace(newest, desired)
+                                            known_audio.discard(newest)
+                                            known_audio.add(desired)
                                     except Exception:
                                         pass
 
-                                track["status"] = "completed"
+                                set_track_status(track, "completed")
                                 track["progress"] = 100
                                 await update_overall_progress()
                             except Exception as e:  # noqa: BLE001
-                                track["status"] = "error"
+                                set_track_status(track, "error")
                                 track["progress"] = 0
                                 msg = str(e) or e.__class__.__name__
-                                if (
-                                    "confirm you\u2019re not a bot" in msg
-                                    or "confirm you're not a bot" in msg
-                                    or "temporarily limiting requests" in msg
-                                    or "HTTP Error 429" in msg
-                                    or "429" in msg
-                                ):
+                                if _THROTTLED_RE.search(msg):
                                     # Privacy-friendly guidance (no cookies required).
                                     msg = (
                                         "Service busy: YouTube is limiting requests from this server IP. "
@@ -1058,8 +1230,34 @@ class DownloadService:
                                 track["error"] = msg[-500:]
                                 await update_overall_progress()
 
+                    async def run_download_workers() -> None:
+                        # Start workers as slots free up rather than one Task per track up front; the
+                        # shared semaphore inside download_worker still bounds work across tasks.
+                        pending = iter(tracks)
+                        inflight: set[asyncio.Task[None]] = set()
+                        try:
+                            while True:
+                                while len(inflight) < self._max_workers:
+                                    track = next(pending, None)
+                                    if track is None:
+                                        break
+                                    inflight.add(asyncio.create_task(download_worker(cast(Dict[str, Any], track))))
+                                if not inflight:
+                                    return
+                                finished, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                                for worker in finished:
+                                    worker.result()
+                        finally:
+                            for worker in inflight:
+                                worker.cancel()
+                            if inflight:
+                                await asyncio.gather(*inflight, return_exceptions=True)
+
                     await update_overall_progress(force=True)
-                    await asyncio.gather(*[download_worker(cast(Dict[str, Any], t)) for t in tracks])
+                    try:
+                        await run_download_workers()
+                    finally:
+                        drop_pooled_instances()
 
                     if await should_cancel():
                         task_state["status"] = "cancelled"
@@ -1074,7 +1272,7 @@ class DownloadService:
 
                     DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
 
-                    audio_files = [f for f in download_dir.rglob("*") if f.is_file() and f.suffix.lower() in audio_exts]
+                    audio_files = list(_scan_audio_files(download_dir))
                     if len(audio_files) == 0:
                         # Surface a helpful error message for debugging in production.
                         failures: list[str] = []
@@ -1109,11 +1307,16 @@ class DownloadService:
                         task_state["message"] = "Zipping..."
                         task_state["progress"] = max(float(task_state.get("progress") or 0), 95.0)
                         await self._db.save_full_task_state(task_id, task_state)
-                        zip_path = await loop.run_in_executor(
-                            None, lambda: shutil.make_archive(str(base_dir / zip_name), "zip", download_dir)
-                        )
+                        # Written next to its final name, not in the temp dir, so finishing is a rename
+                        # rather than a copy when the temp dir is on another filesystem (e.g. tmpfs).
                         final_path = DOWNLOADS_DIR / f"{zip_name}.zip"
-                        shutil.move(zip_path, final_path)
+                        partial_path = final_path.with_name(f"{final_path.name}.part")
+                        try:
+                            await loop.run_in_executor(None, _zip_dir, download_dir, partial_path)
+                            os.replace(partial_path, final_path)
+                        except BaseException:
+                            partial_path.unlink(missing_ok=True)
+                            raise
                         task_state["message"] = "Download Ready!"
 
                     task_state["status"] = "completed"
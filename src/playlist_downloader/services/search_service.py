@@ -1,14 +1,67 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, List, Optional, cast
+import re
+import time
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Tuple, TypeVar, cast
 
+import httpx
 import requests
 import yt_dlp
 from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 from ytmusicapi import YTMusic
 
 from ..integrations.spotify_client import SpotifyClient
+from ..providers.http import response_json
+
+_SPOTIFY_SEARCH_URL = "https://api.spotify.com/v1/search"
+_SPOTIFY_SEARCH_TIMEOUT_SECONDS = 5.0
+# One page size for both search and suggestions so they share cached responses.
+_SPOTIFY_SEARCH_LIMIT = 5
+# Spotify serves search with max-age=120; typing bursts repeat the same queries well within that.
+_SPOTIFY_SEARCH_TTL_SECONDS = 120.0
+_SPOTIFY_SEARCH_CACHE_MAX = 1024
+# YTMusic / SoundCloud results; empty ones (no hits, or the provider failing) expire sooner.
+_RESULTS_TTL_SECONDS = 300.0
+_EMPTY_RESULTS_TTL_SECONDS = 30.0
+_RESULTS_CACHE_MAX = 512
+# SoundCloud's web client API; its client_id is read from the site's own JS bundles.
+_SOUNDCLOUD_HOME_URL = "https://soundcloud.com"
+_SOUNDCLOUD_SEARCH_URL = "https://api-v2.soundcloud.com/search/tracks"
+_SOUNDCLOUD_CLIENT_ID_TTL_SECONDS = 24 * 3600.0
+_SOUNDCLOUD_SCRIPT_RE = re.compile(r'<script[^>]+src="(https://a-v2\.sndcdn\.com/assets/[^"]+\.js)"')
+_SOUNDCLOUD_CLIENT_ID_RE = re.compile(r'client_id\s*:\s*"(\w+)"')
+# Concurrent upstream calls per provider; a SoundCloud call may fall back to a yt-dlp scrape.
+_PROVIDER_CONCURRENCY = {"spotify": 16, "youtube": 8, "soundcloud": 4}
+# After a Spotify 429, skip Spotify for Retry-After (at least 1s, doubling per repeat, capped).
+_SPOTIFY_MAX_COOLDOWN_SECONDS = 60.0
+# Uncached suggestion lookups wait this long for the same session to keep typing.
+_SUGGEST_DEBOUNCE_SECONDS = 0.03
+# A session's last fetched suggestions, reused (filtered) while it keeps extending that query.
+_RECENT_SUGGESTIONS_TTL_SECONDS = 60.0
+_RECENT_SUGGESTIONS_MAX = 1024
+# Providers in result order, and how long any one may hold up a combined search.
+_SEARCH_PROVIDERS = ("spotify", "youtube", "soundcloud")
+_PROVIDER_TIMEOUT_SECONDS = 6.0
+
+
+T = TypeVar("T")
+
+
+def _query_key(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _make_room(cache: Dict[Any, Tuple[float, Any]], limit: int) -> None:
+    # Drop expired entries once full; if that frees nothing, drop the oldest insert.
+    if len(cache) < limit:
+        return
+    now = time.monotonic()
+    for key in [k for k, (expiry, _) in cache.items() if expiry <= now]:
+        del cache[key]
+    if len(cache) >= limit:
+        cache.pop(next(iter(cache)))
 
 
 class SearchRequest(BaseModel):
@@ -19,30 +72,191 @@ class SearchRequest(BaseModel):
 class SearchManager:
     def __init__(self, *, spotify_client: SpotifyClient):
         self._spotify_client = spotify_client
-        self._yt = YTMusic()
+        # YTMusic searches run in executor threads, up to the provider limit at once; size the
+        # keep-alive pool to match so none of them opens (and then discards) its own connection.
+        yt_session = requests.Session()
+        yt_slots = _PROVIDER_CONCURRENCY["youtube"]
+        yt_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=yt_slots))
+        self._yt = YTMusic(requests_session=yt_session)
+        self._http: Optional[httpx.AsyncClient] = None
+        # normalized query -> (expiry, raw search response)
+        self._spotify_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # (provider, normalized query) -> the upstream call currently serving it
+        self._inflight: Dict[Tuple[str, str], asyncio.Future[Any]] = {}
+        # (provider, normalized query) -> (expiry, normalized results)
+        self._results_cache: Dict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+        self._provider_slots = {name: asyncio.Semaphore(n) for name, n in _PROVIDER_CONCURRENCY.items()}
+        self._spotify_blocked_until = 0.0
+        self._spotify_429_streak = 0
+        # session -> its newest suggestion request, until that one has answered
+        self._latest_suggest: Dict[str, asyncio.Future[List[Dict[str, str]]]] = {}
+        # session -> (expiry, (normalized query, its provider suggestions))
+        self._recent_suggestions: Dict[str, Tuple[float, Tuple[str, List[Dict[str, str]]]]] = {}
+        # (expiry, client_id) for SoundCloud's api-v2
+        self._soundcloud_client_id: Optional[Tuple[float, str]] = None
+
+    def _get_http(self) -> httpx.AsyncClient:
+        # Created lazily (it binds to the running loop); keep-alive spares each search a TLS handshake.
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=_SPOTIFY_SEARCH_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=16, keepalive_expiry=60),
+            )
+        return self._http
+
+    async def _single_flight(self, key: Tuple[str, str], run: Callable[[], Awaitable[T]]) -> T:
+        """Callers asking for ``key`` while it is already being fetched await that same call."""
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = self._inflight[key] = asyncio.ensure_future(run())
+
+            def _done(fut: asyncio.Future[Any]) -> None:
+                self._inflight.pop(key, None)
+                if not fut.cancelled():
+                    fut.exception()  # retrieved here in case every waiter gave up
+
+            inflight.add_done_callback(_done)
+        # Shielded: one caller timing out or disconnecting mustn't cancel it for the rest.
+        return await asyncio.shield(inflight)
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _spotify_token(self) -> str:
+        client = self._spotify_client
+        if client.token and time.time() < client.token_expiry:
+            return client.token
+        # Refreshing goes through the client's blocking requests session.
+        return await asyncio.get_running_loop().run_in_executor(None, client._get_token)
+
+    def cached_spotify_search(self, query: str) -> Optional[Dict[str, Any]]:
+        cached = self._spotify_cache.get(_query_key(query))
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    async def spotify_search(self, query: str) -> Optional[Dict[str, Any]]:
+        """Raw Spotify search response for tracks, albums and playlists, or None on a non-200."""
+        cached = self.cached_spotify_search(query)
+        if cached is not None:
+            return cached
+        key = _query_key(query)
+        return await self._single_flight(("spotify", key), lambda: self._fetch_spotify_search(query, key))
+
+    def narrow_recent_suggestions(self, session_id: str, query: str) -> List[Dict[str, str]]:
+        """The session's recent suggestions still matching ``query``, if it extends their query."""
+        recent = self._recent_suggestions.get(session_id)
+        if recent is None or recent[0] <= time.monotonic():
+            return []
+        prev_key, items = recent[1]
+        key = _query_key(query)
+        if not key.startswith(prev_key):
+            return []
+        return [s for s in items if key in _query_key(s["label"])]
+
+    def remember_suggestions(self, session_id: str, query: str, items: List[Dict[str, str]]) -> None:
+        _make_room(self._recent_suggestions, _RECENT_SUGGESTIONS_MAX)
+        self._recent_suggestions[session_id] = (
+            time.monotonic() + _RECENT_SUGGESTIONS_TTL_SECONDS,
+            (_query_key(query), items),
+        )
+
+    async def debounce_suggestions(
+        self, session_id: str, build: Callable[[], Awaitable[List[Dict[str, str]]]]
+    ) -> List[Dict[str, str]]:
+        """Run ``build`` for the session's newest request only; the requests it superseded get its result."""
+
+        async def settle() -> List[Dict[str, str]]:
+            await asyncio.sleep(_SUGGEST_DEBOUNCE_SECONDS)
+            newest = self._latest_suggest.get(session_id)
+            if newest is not None and newest is not request:
+                return await newest
+            try:
+                return await build()
+            finally:
+                if self._latest_suggest.get(session_id) is request:
+                    del self._latest_suggest[session_id]
+
+        request = self._latest_suggest[session_id] = asyncio.ensure_future(settle())
+
+        def _done(fut: asyncio.Future[Any]) -> None:
+            if not fut.cancelled():
+                fut.exception()  # retrieved here in case the caller gave up
+
+        request.add_done_callback(_done)
+        # Shielded: another tab's requests may be waiting on this one after its caller disconnects.
+        return await asyncio.shield(request)
+
+    async def _fetch_spotify_search(self, query: str, key: str) -> Optional[Dict[str, Any]]:
+        # Searches are interactive: while rate limited, answer "no Spotify results" instead of waiting.
+        if time.monotonic() < self._spotify_blocked_until:
+            return None
+        async with self._provider_slots["spotify"]:
+            token = await self._spotify_token()
+            resp = await self._get_http().get(
+                _SPOTIFY_SEARCH_URL,
+                headers={"Authorization": f"Bearer {token}"},
+                params={"q": query, "type": "track,album,playlist", "limit": _SPOTIFY_SEARCH_LIMIT},
+            )
+        if resp.status_code == 429:
+            self._spotify_429_streak += 1
+            try:
+                retry_after = float(resp.headers.get("Retry-After", 0))
+            except ValueError:
+                retry_after = 0.0
+            backoff = max(retry_after, 2.0 ** (self._spotify_429_streak - 1))
+            self._spotify_blocked_until = time.monotonic() + min(backoff, _SPOTIFY_MAX_COOLDOWN_SECONDS)
+            return None
+        if resp.status_code != 200:
+            return None
+        self._spotify_429_streak = 0
+        data = response_json(resp)
+
+        _make_room(self._spotify_cache, _SPOTIFY_SEARCH_CACHE_MAX)
+        self._spotify_cache[key] = (time.monotonic() + _SPOTIFY_SEARCH_TTL_SECONDS, data)
+        return data
+
+    async def _cached_search(
+        self, provider: str, query: str, run: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        key = (provider, _query_key(query))
+        cached = self._results_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        async def fetch() -> List[Dict[str, Any]]:
+            async with self._provider_slots[provider]:
+                results = await run()
+            ttl = _RESULTS_TTL_SECONDS if results else _EMPTY_RESULTS_TTL_SECONDS
+            _make_room(self._results_cache, _RESULTS_CACHE_MAX)
+            self._results_cache[key] = (time.monotonic() + ttl, results)
+            return results
+
+        return await self._single_flight(key, fetch)
+
+    async def search_all(self, query: str, providers: Collection[str]) -> List[Dict[str, Any]]:
+        """Query the requested providers concurrently; one that fails or times out contributes nothing."""
+        searches = [
+            asyncio.wait_for(getattr(self, f"search_{name}")(query), _PROVIDER_TIMEOUT_SECONDS)
+            for name in _SEARCH_PROVIDERS
+            if name in providers
+        ]
+        merged: List[Dict[str, Any]] = []
+        for result in await asyncio.gather(*searches, return_exceptions=True):
+            if isinstance(result, list):
+                merged.extend(result)
+        return merged
 
     async def search_spotify(self, query: str) -> List[Dict[str, Any]]:
         try:
             results: List[Dict[str, Any]] = []
-            loop = asyncio.get_running_loop()
-
-            token = self._spotify_client._get_token()
-            headers = {"Authorization": f"Bearer {token}"}
-
-            resp = await loop.run_in_executor(
-                None,
-                lambda: requests.get(
-                    "https://api.spotify.com/v1/search",
-                    headers=headers,
-                    params={"q": query, "type": "track,album,playlist", "limit": 4},
-                    timeout=5,
-                ),
-            )
-            if resp.status_code != 200:
+            data = await self.spotify_search(query)
+            if data is None:
                 return []
-            data = resp.json()
 
-            for t in data.get("tracks", {}).get("items", []):
+            for t in data.get("tracks", {}).get("items", [])[:4]:
                 results.append(
                     {
                         "title": t["name"],
@@ -55,7 +269,7 @@ class SearchManager:
                     }
                 )
 
-            for a in data.get("albums", {}).get("items", []):
+            for a in data.get("albums", {}).get("items", [])[:4]:
                 results.append(
                     {
                         "title": a["name"],
@@ -68,7 +282,7 @@ class SearchManager:
                     }
                 )
 
-            for p in data.get("playlists", {}).get("items", []):
+            for p in data.get("playlists", {}).get("items", [])[:4]:
                 if not p:
                     continue
                 results.append(
@@ -88,6 +302,9 @@ class SearchManager:
             return []
 
     async def search_youtube(self, query: str) -> List[Dict[str, Any]]:
+        return await self._cached_search("youtube", query, lambda: self._search_youtube(query))
+
+    async def _search_youtube(self, query: str) -> List[Dict[str, Any]]:
         try:
             loop = asyncio.get_running_loop()
             results = await loop.run_in_executor(None, lambda: self._yt.search(query, filter="songs", limit=4))
@@ -122,6 +339,65 @@ class SearchManager:
             return []
 
     async def search_soundcloud(self, query: str) -> List[Dict[str, Any]]:
+        return await self._cached_search("soundcloud", query, lambda: self._search_soundcloud(query))
+
+    async def _search_soundcloud(self, query: str) -> List[Dict[str, Any]]:
+        # One JSON request instead of spinning up yt-dlp's extractor chain; the scrape stays as fallback.
+        try:
+            return await self._search_soundcloud_api(query)
+        except Exception:
+            return await self._search_soundcloud_ytdlp(query)
+
+    async def _soundcloud_api_client_id(self) -> str:
+        cached = self._soundcloud_client_id
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        # Not a provider name, so no search's (provider, query) key can collide with it.
+        return await self._single_flight(("soundcloud:client_id", ""), self._fetch_soundcloud_client_id)
+
+    async def _fetch_soundcloud_client_id(self) -> str:
+        http = self._get_http()
+        resp = await http.get(_SOUNDCLOUD_HOME_URL, follow_redirects=True)
+        resp.raise_for_status()
+        # The id lives in one of the app bundles, in practice one of the last ones loaded.
+        for script_url in reversed(_SOUNDCLOUD_SCRIPT_RE.findall(resp.text)):
+            script = await http.get(script_url)
+            if script.status_code != 200:
+                continue
+            match = _SOUNDCLOUD_CLIENT_ID_RE.search(script.text)
+            if match:
+                client_id = match.group(1)
+                self._soundcloud_client_id = (time.monotonic() + _SOUNDCLOUD_CLIENT_ID_TTL_SECONDS, client_id)
+                return client_id
+        raise RuntimeError("SoundCloud client_id not found")
+
+    async def _search_soundcloud_api(self, query: str) -> List[Dict[str, Any]]:
+        client_id = await self._soundcloud_api_client_id()
+        resp = await self._get_http().get(
+            _SOUNDCLOUD_SEARCH_URL, params={"q": query, "client_id": client_id, "limit": 5}
+        )
+        if resp.status_code in (401, 403):
+            # Rotated ids stop working before our TTL runs out; scrape a fresh one next time.
+            self._soundcloud_client_id = None
+        resp.raise_for_status()
+
+        normalized: List[Dict[str, Any]] = []
+        for t in response_json(resp).get("collection") or ():
+            user = t.get("user") or {}
+            normalized.append(
+                {
+                    "title": t.get("title"),
+                    "uploader": user.get("username"),
+                    "duration": (t.get("duration") or 0) / 1000,
+                    "url": t.get("permalink_url"),
+                    "thumbnail": t.get("artwork_url") or user.get("avatar_url"),
+                    "type": "track",
+                    "source": "soundcloud",
+                }
+            )
+        return normalized
+
+    async def _search_soundcloud_ytdlp(self, query: str) -> List[Dict[str, Any]]:
         try:
             loop = asyncio.get_running_loop()
 
@@ -151,26 +427,35 @@ class SearchManager:
             return []
 
 
-def build_suggestions(*, query: str, spotify_client: SpotifyClient, search_manager: SearchManager) -> List[Dict[str, str]]:
+async def build_suggestions(
+    *, query: str, search_manager: SearchManager, session_id: Optional[str] = None
+) -> List[Dict[str, str]]:
     query = (query or "").strip()
     if len(query) < 2:
         return []
+    search_item = {"label": f'Search "{query}"', "value": query, "type": "text", "action": "search"}
+    # Typing "rad" -> "radi" -> "radio": answer from what "rad" fetched while it still has matches.
+    if session_id:
+        narrowed = search_manager.narrow_recent_suggestions(session_id, query)
+        if narrowed:
+            return [search_item, *narrowed][:10]
+    # Keystrokes arrive faster than Spotify answers: only the last one of a burst goes upstream,
+    # and the requests it superseded answer with its suggestions.
+    if session_id and search_manager.cached_spotify_search(query) is None:
+        return await search_manager.debounce_suggestions(
+            session_id, lambda: _fetch_suggestions(query, search_item, search_manager, session_id)
+        )
+    return await _fetch_suggestions(query, search_item, search_manager, session_id)
 
-    suggestions: List[Dict[str, str]] = []
-    suggestions.append({"label": f'Search "{query}"', "value": query, "type": "text", "action": "search"})
 
-    try:
-        token = spotify_client._get_token()
-        headers = {"Authorization": f"Bearer {token}"}
-        resp = requests.get(
-            "https://api.spotify.com/v1/search",
-            headers=headers,
-            params={"q": query, "type": "track,album,playlist", "limit": 5},
-            timeout=5,
-        )
-        if resp.status_code == 200:
-            data = resp.json()
+async def _fetch_suggestions(
+    query: str, search_item: Dict[str, str], search_manager: SearchManager, session_id: Optional[str]
+) -> List[Dict[str, str]]:
+    suggestions: List[Dict[str, str]] = [search_item]
 
+    try:
+        data = await search_manager.spotify_search(query)
+        if data is not None:
             for t in data.get("tracks", {}).get("items", [])[:2]:
                 artist = (t.get("artists") or [{}])[0].get("name") or "Unknown"
                 suggestions.append(
@@ -212,7 +497,10 @@ def build_suggestions(*, query: str, spotify_client: SpotifyClient, search_manag
     except Exception:
         pass
 
-    return [s for s in suggestions if s.get("value")][:10]
+    suggestions = [s for s in suggestions if s.get("value")][:10]
+    if session_id:
+        search_manager.remember_suggestions(session_id, query, suggestions[1:])
+    return suggestions
 
 
 def _normalize_text(s: str) -> str:
@@ -223,21 +511,29 @@ def relevance_score(item: Dict[str, Any], query: str) -> int:
     q = _normalize_text(query)
     if not q:
         return 0
+    return _score_normalized(item, q, _query_tokens(q))
+
 
+def _query_tokens(q: str) -> List[str]:
+    return [t for t in q.split() if len(t) >= 2]
+
+
+def _score_normalized(item: Dict[str, Any], q: str, tokens: List[str]) -> int:
     title = _normalize_text(cast(str, item.get("title", "")))
     uploader = _normalize_text(cast(str, item.get("uploader", "")))
 
+    # Exact implies prefix implies substring, so test the cheapest conclusive case first
+    # and award the implied bonuses with it (120 + 80 + 50, 80 + 50, 50).
     score = 0
     if title == q:
-        score += 120
-    if title.startswith(q):
-        score += 80
-    if q in title:
+        score += 250
+    elif title.startswith(q):
+        score += 130
+    elif q in title:
         score += 50
     if q in uploader:
         score += 10
 
-    tokens = [t for t in q.split() if len(t) >= 2]
     if tokens:
         token_hits = sum(1 for t in tokens if t in title)
         score += token_hits * 12
@@ -253,3 +549,25 @@ def relevance_score(item: Dict[str, Any], query: str) -> int:
         score += 4
 
     return score
+
+
+def rank_results(items: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """Order results by relevance (then title), best first.
+
+    Keys are computed once per item and the query is normalized once; the
+    negated index keeps ties in their original order and stops the sort from
+    ever comparing the dicts themselves.
+    """
+    q = _normalize_text(query)
+    tokens = _query_tokens(q)
+    decorated = [
+        (
+            _score_normalized(it, q, tokens) if q else 0,
+            _normalize_text(it.get("title", "") or ""),
+            -i,
+            it,
+        )
+        for i, it in enumerate(items)
+    ]
+    decorated.sort(reverse=True)
+    return [it for _score, _title, _i, it in decorated]
@@ -1,32 +1,144 @@
+import asyncio
 import json
 import os
-from typing import List, Dict
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, Dict, Optional, Tuple
 from datetime import datetime
 
-HISTORY_FILE = "history.json"
+try:  # optional: faster (de)serialization, and it emits bytes ready for os.write
+    import orjson
 
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:  # pragma: no cover
+    _loads = json.loads
 
-def load_history() -> List[Dict]:
-    if not os.path.exists(HISTORY_FILE):
-        return []
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+try:  # POSIX: serialize compaction across uvicorn worker processes
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# One JSON object per line, oldest first; a save appends a line instead of rewriting the file.
+HISTORY_FILE = "history.jsonl"
+# Pre-JSONL format (a JSON array, newest first); read once if no JSONL file exists yet.
+_LEGACY_HISTORY_FILE = "history.json"
+_MAX_ITEMS = 50
+# Rewrite the file from memory once appends leave this many lines on disk.
+_COMPACT_AT_LINES = 200
+
+# Newest first, mirrored from the file on first use.
+_history: Optional[Deque[Dict]] = None
+_lines_on_disk = 0
+# (inode, size, mtime) of the file as _history last saw it; a mismatch means another
+# worker process appended or compacted since, so the file is read again.
+_seen_signature: Optional[Tuple[int, int, int]] = None
+_lock = threading.Lock()
+
+
+def _signature(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _file_signature() -> Optional[Tuple[int, int, int]]:
     try:
+        return _signature(os.stat(HISTORY_FILE))
+    except FileNotFoundError:
+        return None
+
+
+def _read_file() -> Deque[Dict]:
+    global _lines_on_disk, _seen_signature
+    _lines_on_disk = 0
+    _seen_signature = None
+    items: Deque[Dict] = deque(maxlen=_MAX_ITEMS)
+    if os.path.exists(HISTORY_FILE):
         with open(HISTORY_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
+            # Taken before reading: a line appended meanwhile only causes one extra re-read later.
+            _seen_signature = _signature(os.fstat(f.fileno()))
+            for line in f:
+                _lines_on_disk += 1
+                try:
+                    items.appendleft(_loads(line))
+                except ValueError:
+                    continue  # e.g. a line cut short by a crash mid-write
+        return items
+    if os.path.exists(_LEGACY_HISTORY_FILE):
+        try:
+            with open(_LEGACY_HISTORY_FILE, "r") as f:
+                items.extend(json.load(f)[:_MAX_ITEMS])
+        except Exception:
+            pass
+        # Nothing of this is in the JSONL file yet; make the first save write it all out.
+        _lines_on_disk = _COMPACT_AT_LINES
+    return items
+
+
+def _loaded() -> Deque[Dict]:
+    global _history
+    if _history is None or _file_signature() != _seen_signature:
+        _history = _read_file()
+    return _history
+
+
+@contextmanager
+def _process_lock():
+    if fcntl is None:
+        yield
+        return
+    with open(f"{HISTORY_FILE}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_history() -> List[Dict]:
+    with _lock:
+        return list(_loaded())
 
 
 def save_history_item(item: Dict):
-    history = load_history()
+    global _lines_on_disk, _seen_signature
     # Add timestamp
     item["timestamp"] = datetime.now().isoformat()
-    history.insert(0, item)  # Prepend
-    # Keep last 50
-    history = history[:50]
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+    line = _dumps(item) + b"\n"
+    with _lock, _process_lock():
+        # Under the process lock, so this also picks up anything other workers appended.
+        history = _loaded()
+        if _lines_on_disk + 1 >= _COMPACT_AT_LINES:
+            history.appendleft(item)
+            tmp = f"{HISTORY_FILE}.tmp"
+            with open(tmp, "wb") as f:
+                f.writelines(_dumps(h) + b"\n" for h in reversed(history))
+            os.replace(tmp, HISTORY_FILE)
+            _lines_on_disk = len(history)
+            _seen_signature = _file_signature()
+        else:
+            history.appendleft(item)  # Prepend; maxlen keeps the last 50
+            # One O_APPEND write per line, so concurrent appenders never interleave within a line.
+            fd = os.open(HISTORY_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                _seen_signature = _signature(os.fstat(fd))
+            finally:
+                os.close(fd)
+            _lines_on_disk += 1
 
 
 def get_history() -> List[Dict]:
     return load_history()
 
+
+# For async callers: the writes (and the first read) hit the disk, so keep them off the event loop.
+async def asave_history_item(item: Dict):
+    await asyncio.to_thread(save_history_item, item)
+
+
+async def aget_history() -> List[Dict]:
+    return await asyncio.to_thread(load_history)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import re
-
-_INVALID_FILENAME_CHARS = re.compile(r"[<>:\"/\\|?*]")
+# Deletion table for characters Windows (and "/" everywhere) rejects; str.translate is a
+# single C-level pass, cheaper than a regex substitution for a fixed character set.
+_INVALID_FILENAME_CHARS = str.maketrans("", "", '<>:"/\\|?*')
 
 
 def sanitize_filename(name: str, *, max_len: int = 200) -> str:
@@ -11,7 +11,7 @@ def sanitize_filename(name: str, *, max_len: int = 200) -> str:
     Keeps behavior consistent across backend modules.
     """
 
-    cleaned = _INVALID_FILENAME_CHARS.sub("", name or "").strip()
+    cleaned = (name or "").translate(_INVALID_FILENAME_CHARS).strip()
     if not cleaned:
         return "untitled"
     return cleaned[:max_len]
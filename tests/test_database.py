@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from playlist_downloader import database
+
+
+@pytest.fixture
+def make_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        database, "settings", SimpleNamespace(DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'tasks.db'}")
+    )
+    return database.DatabaseManager
+
+
+def _state(status, progress, options=None):
+    return {"status": status, "progress": progress, "message": None, "playlist": {}, "options": options or {}}
+
+
+def test_cancel_flag_survives_buffered_progress_writes(make_db):
+    async def run():
+        db = make_db()
+        await db.init_db()
+        try:
+            await db.create_task("t1", "https://example.com/p", owner_id="dev")
+            await db.save_full_task_state("t1", _state("downloading", 0))
+            await db.save_full_task_state("t1", _state("downloading", 10))
+            assert "t1" in db._pending  # same status: buffered, not written through
+
+            assert await db.request_cancel("t1", "dev")
+            # The downloader's next tick still carries its own, pre-cancel options.
+            await db.save_full_task_state("t1", _state("downloading", 20))
+            await db.flush()
+
+            assert await db.is_cancel_requested("t1")
+            task = await db.get_task("t1")
+            assert task["progress"] == 20
+            assert task["options"]["cancel_requested"] is True
+        finally:
+            await db.close()
+
+    asyncio.run(run())
+
+
+def test_status_updated_at_moves_only_on_status_change(make_db):
+    async def run():
+        db = make_db()
+        await db.init_db()
+        try:
+            await db.create_task("t1", "https://example.com/p", owner_id="dev")
+            await db.save_full_task_state("t1", _state("downloading", 0))
+            started = (await db.get_task("t1"))["status_updated_at"]
+
+            await asyncio.sleep(0.01)
+            await db.save_full_task_state("t1", _state("downloading", 50))
+            await db.flush()
+            task = await db.get_task("t1")
+            assert task["progress"] == 50
+            assert task["status_updated_at"] == started
+
+            await asyncio.sleep(0.01)
+            await db.save_full_task_state("t1", _state("zipping", 90))
+            assert (await db.get_task("t1"))["status_updated_at"] > started
+        finally:
+            await db.close()
+
+    asyncio.run(run())
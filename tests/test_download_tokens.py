@@ -0,0 +1,56 @@
+import pytest
+
+from playlist_downloader.utils import download_tokens
+from playlist_downloader.utils.download_tokens import (
+    _HEADER,
+    _TOKEN_VERSION,
+    _b64url_encode,
+    _sign,
+    create_download_token,
+    verify_download_token,
+)
+
+SECRET = "s" * 80  # longer than BLAKE2b's 64-byte key limit
+
+
+def _signed(payload: bytes, secret: str = SECRET) -> str:
+    return f"{_b64url_encode(payload)}.{_b64url_encode(_sign(payload, secret))}"
+
+
+def test_round_trip_keeps_ids_with_any_characters():
+    token = create_download_token(task_id="task-ü.1", owner_id="dev:ä/2", secret=SECRET, ttl_seconds=60)
+    claims = verify_download_token(token=token, secret=SECRET)
+    assert claims is not None
+    assert (claims["task_id"], claims["owner_id"]) == ("task-ü.1", "dev:ä/2")
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    token = create_download_token(task_id="t", owner_id="o", secret=SECRET)
+    payload_b64, sig_b64 = token.split(".")
+    flipped = ("A" if payload_b64[0] != "A" else "B") + payload_b64[1:]  # changes the version byte
+
+    assert verify_download_token(token=f"{flipped}.{sig_b64}", secret=SECRET) is None
+    assert verify_download_token(token=token, secret="other") is None
+    assert verify_download_token(token="not-a-token", secret=SECRET) is None
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    monkeypatch.setattr(download_tokens.time, "time", lambda: 1_000.0)
+    token = create_download_token(task_id="t", owner_id="o", secret=SECRET, ttl_seconds=10)
+    monkeypatch.setattr(download_tokens.time, "time", lambda: 1_010.0)
+    assert verify_download_token(token=token, secret=SECRET) is not None
+    monkeypatch.setattr(download_tokens.time, "time", lambda: 1_011.0)
+    assert verify_download_token(token=token, secret=SECRET) is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        _HEADER.pack(_TOKEN_VERSION + 1, 2**40, 1) + b"to",  # unknown version
+        _HEADER.pack(_TOKEN_VERSION, 2**40, 5) + b"ab",  # task_len past the end
+        _HEADER.pack(_TOKEN_VERSION, 2**40, 1)[:-3],  # shorter than the header
+        b"",
+    ],
+)
+def test_malformed_signed_payloads_are_rejected(payload):
+    assert verify_download_token(token=_signed(payload), secret=SECRET) is None
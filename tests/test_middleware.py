@@ -0,0 +1,50 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from playlist_downloader.api.middleware import CombinedEdgeMiddleware
+
+
+def _client(**kwargs) -> TestClient:
+    async def small(request):
+        return PlainTextResponse("ok")
+
+    async def large(request):
+        return PlainTextResponse("x" * 5000)
+
+    app = Starlette(routes=[Route("/small", small), Route("/large", large)])
+    app.add_middleware(CombinedEdgeMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def test_large_body_is_gzipped():
+    resp = _client().get("/large", headers={"accept-encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == "x" * 5000
+
+
+def test_small_body_is_not_gzipped():
+    resp = _client().get("/small", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+    assert resp.text == "ok"
+
+
+def test_cors_mirrors_origin_with_credentials():
+    resp = _client().get("/small", headers={"origin": "https://app.example"})
+    assert resp.headers["access-control-allow-origin"] == "https://app.example"
+    assert resp.headers["access-control-allow-credentials"] == "true"
+
+
+def test_preflight_rejects_unknown_origin():
+    client = _client(allow_origins=["https://app.example"])
+    resp = client.options(
+        "/small",
+        headers={"origin": "https://evil.example", "access-control-request-method": "POST"},
+    )
+    assert resp.status_code == 400
+
+
+def test_untrusted_host_rejected():
+    client = _client(allowed_hosts=["api.example"])
+    assert client.get("/small").status_code == 400
@@ -1,3 +1,6 @@
+import pytest
+from pydantic import ValidationError
+
 from playlist_downloader.models import Playlist, Track, _sanitize_filename, collect_track_stats
 
 
@@ -16,3 +19,14 @@ def test_track_target_filename_builds_nested_path():
     filename = track.target_filename("Playlist")
     assert "Playlist" in str(filename)
     assert filename.suffix == ".mp3"
+
+
+def test_track_rejects_non_http_stream_url():
+    with pytest.raises(ValidationError):
+        Track(id="1", title="Bad", stream_url="ftp://example.com/song.mp3")
+
+
+def test_track_encodes_spaces_and_trims_whitespace_in_urls():
+    track = Track(id="1", title="Ok", stream_url=" https://cdn.shop/a b.mp3\n", cover_url="https://cdn.shop/é.jpg")
+    assert track.stream_url == "https://cdn.shop/a%20b.mp3"
+    assert track.cover_url == "https://cdn.shop/%C3%A9.jpg"
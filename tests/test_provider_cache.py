@@ -0,0 +1,20 @@
+from playlist_downloader.providers import cache as cache_module
+from playlist_downloader.providers.cache import TTLFileCache
+
+
+def test_entries_survive_reload(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = TTLFileCache(path)
+    cache.set("sc:stream:1", "https://cdn.example/1", ttl_seconds=60)
+    cache.save()
+
+    assert TTLFileCache(path).get("sc:stream:1") == "https://cdn.example/1"
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    cache = TTLFileCache(tmp_path / "cache.json")
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1000.0)
+    cache.set("sc:token:abc", "token", ttl_seconds=10)
+
+    monkeypatch.setattr(cache_module.time, "time", lambda: 1011.0)
+    assert cache.get("sc:token:abc") is None
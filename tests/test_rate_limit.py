@@ -0,0 +1,43 @@
+from playlist_downloader.api import rate_limit
+from playlist_downloader.api.rate_limit import BucketTimeRateLimit
+
+
+def _freeze(monkeypatch, seconds: int) -> None:
+    monkeypatch.setattr(rate_limit.time, "time_ns", lambda: seconds * 1_000_000_000)
+
+
+def test_bucket_limit_rejects_after_limit(monkeypatch):
+    _freeze(monkeypatch, 1000)
+    limiter = BucketTimeRateLimit(limit=3, window_seconds=60)
+    assert [limiter.hit("a") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("b") is True
+
+
+def test_bucket_limit_slides_with_time(monkeypatch):
+    limiter = BucketTimeRateLimit(limit=2, window_seconds=10)
+    _freeze(monkeypatch, 100)
+    assert limiter.hit("a") and limiter.hit("a")
+    _freeze(monkeypatch, 105)
+    assert limiter.hit("a") is False
+    _freeze(monkeypatch, 110)
+    assert limiter.hit("a") is True
+
+
+def test_prepare_limit_keeps_slowapi_error_body(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(rate_limit, "prepare_limiter", BucketTimeRateLimit(limit=1, window_seconds=60))
+    app = FastAPI()
+    rate_limit.init_rate_limiter(app)
+
+    @app.post("/prepare")
+    def prepare(request: rate_limit.Request):
+        rate_limit.enforce_prepare_rate_limit(request)
+        return {}
+
+    client = TestClient(app)
+    assert client.post("/prepare").status_code == 200
+    resp = client.post("/prepare")
+    assert resp.status_code == 429
+    assert resp.json() == {"error": "Rate limit exceeded: 1 per 1 minute"}
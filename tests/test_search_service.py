@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+
+from playlist_downloader.services.search_service import SearchManager, build_suggestions
+
+_SC_HOME = '<script crossorigin src="https://a-v2.sndcdn.com/assets/50-app.js"></script>'
+_SC_TRACK = {"title": "T", "duration": 1000, "permalink_url": "https://soundcloud.com/a/t", "user": {"username": "A"}}
+
+
+def _manager(handler) -> SearchManager:
+    manager = SearchManager(spotify_client=None)
+    manager._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return manager
+
+
+def _soundcloud(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "soundcloud.com":
+        return httpx.Response(200, text=_SC_HOME)
+    if request.url.host == "a-v2.sndcdn.com":
+        return httpx.Response(200, text='x={client_id:"abc123"}')
+    return httpx.Response(200, json={"collection": [_SC_TRACK]})
+
+
+def test_soundcloud_search_for_client_id_text_completes():
+    # The client_id lookup must not share a single-flight key with a search for "client_id".
+    async def run():
+        manager = _manager(_soundcloud)
+        try:
+            results = await asyncio.wait_for(manager.search_soundcloud("Client_ID"), 2)
+        finally:
+            await manager.aclose()
+        assert [r["title"] for r in results] == ["T"]
+        assert manager._inflight == {}
+
+    asyncio.run(run())
+
+
+def _spotify(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["q"])
+        item = {"name": request.url.params["q"], "artists": [{"name": "A"}], "external_urls": {"spotify": "u"}}
+        return httpx.Response(200, json={"tracks": {"items": [item]}})
+
+    return handler
+
+
+class _Token:
+    token = "t"
+    token_expiry = float("inf")
+
+
+def test_superseded_suggestions_share_the_newest_result():
+    async def run():
+        calls = []
+        manager = _manager(_spotify(calls))
+        manager._spotify_client = _Token()
+
+        async def typed(query, delay):
+            await asyncio.sleep(delay)
+            return await build_suggestions(query=query, search_manager=manager, session_id="dev")
+
+        try:
+            results = await asyncio.gather(typed("ab", 0), typed("abc", 0.005), typed("xyz", 0.01))
+        finally:
+            await manager.aclose()
+        assert calls == ["xyz"]
+        assert results[0] == results[1] == results[2]
+        assert [s["label"] for s in results[0]] == ['Search "xyz"', "xyz — A"]
+        assert manager._latest_suggest == {}
+
+    asyncio.run(run())
+
+
+def test_identical_searches_share_one_upstream_call_despite_a_cancelled_caller():
+    async def run():
+        calls = []
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.params["q"])
+            await release.wait()
+            return httpx.Response(200, json={"tracks": {"items": []}})
+
+        manager = _manager(handler)
+        manager._spotify_client = _Token()
+        try:
+            callers = [asyncio.ensure_future(manager.spotify_search(q)) for q in ("Daft Punk", "daft  punk", "DAFT PUNK")]
+            await asyncio.sleep(0.01)
+            callers[0].cancel()
+            release.set()
+            results = await asyncio.gather(*callers, return_exceptions=True)
+        finally:
+            await manager.aclose()
+        assert calls == ["Daft Punk"]
+        assert isinstance(results[0], asyncio.CancelledError)
+        assert results[1] == results[2] == {"tracks": {"items": []}}
+        assert manager._inflight == {}
+
+    asyncio.run(run())
@@ -0,0 +1,40 @@
+import pytest
+
+from playlist_downloader.providers.shopify import ShopifyPlaylistClient, ShopifyPlaylistError, _salvage_track_entries
+
+
+def _client() -> ShopifyPlaylistClient:
+    return ShopifyPlaylistClient(store_domain="shop.example", access_token="token")
+
+
+def test_salvage_keeps_entries_around_a_malformed_one():
+    raw = '[{"id": 1, "stream_url": "https://a"}, {"id": 2, "title": }, {"id": 3, "stream_url": "https://c"}]'
+    entries, problems = _salvage_track_entries(raw)
+
+    assert [entry["id"] for entry in entries] == [1, 3]
+    assert len(problems) == 1
+
+
+@pytest.mark.parametrize(
+    ("url", "handle"),
+    [("/a/b/", "b"), ("/a", "a"), ("handle", "handle"), ("https://shop.example/pages/playlists/mix/", "mix")],
+)
+def test_extract_handle_uses_last_path_segment(url, handle):
+    assert _client()._extract_handle(url) == handle
+
+
+@pytest.mark.parametrize("url", ["", "/"])
+def test_extract_handle_rejects_empty_path(url):
+    with pytest.raises(ShopifyPlaylistError):
+        _client()._extract_handle(url)
+
+
+def test_salvage_skips_nested_objects_of_a_malformed_entry():
+    raw = (
+        '[{"id": 1, "stream_url": "https://a"}, {"id": 2, "bad": , "tags": [{"k": 1}, {"k": "}"}]},'
+        ' {"id": 3, "title": "no url"}, {"id": 4, "download_url": "https://d"}]'
+    )
+    entries, problems = _salvage_track_entries(raw)
+
+    assert [entry["id"] for entry in entries] == [1, 4]
+    assert len(problems) == 2
@@ -0,0 +1,38 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from playlist_downloader.api.static import ImmutableStaticFiles, _accepted_codings
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "a.js").write_text("plain")
+    (tmp_path / "a.js.gz").write_bytes(gzip.compress(b"from sidecar"))
+    app = FastAPI()
+    app.mount("/assets", ImmutableStaticFiles(directory=tmp_path), name="assets")
+    return TestClient(app)
+
+
+def test_sidecar_is_not_served_to_non_get(client):
+    assert client.post("/assets/a.js", headers={"Accept-Encoding": "gzip"}).status_code == 405
+
+
+def test_sidecar_respects_q_zero(client):
+    resp = client.get("/assets/a.js", headers={"Accept-Encoding": "br, gzip;q=0"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+    assert resp.text == "plain"
+
+
+def test_accepted_codings_parses_quality_values():
+    assert _accepted_codings("gzip;q=0.5, br;q=0, *") == {"gzip": 0.5, "br": 0.0, "*": 1.0}
+
+
+def test_sidecar_served_when_accepted(client):
+    resp = client.get("/assets/a.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == "from sidecar"
+    assert resp.headers["content-type"].startswith("text/javascript")
@@ -0,0 +1,26 @@
+import json
+
+import pytest
+
+from playlist_downloader import storage
+
+
+@pytest.fixture(autouse=True)
+def _fresh_store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(storage, "_history", None)
+    monkeypatch.setattr(storage, "_lines_on_disk", 0)
+    monkeypatch.setattr(storage, "_seen_signature", None)
+
+
+def test_history_sees_lines_appended_by_another_process():
+    storage.save_history_item({"id": "mine"})
+    assert [h["id"] for h in storage.load_history()] == ["mine"]
+
+    # Another worker process appends directly to the shared file.
+    with open(storage.HISTORY_FILE, "a") as f:
+        f.write(json.dumps({"id": "theirs"}) + "\n")
+
+    assert [h["id"] for h in storage.load_history()] == ["theirs", "mine"]
+    storage.save_history_item({"id": "mine-again"})
+    assert [h["id"] for h in storage.load_history()] == ["mine-again", "theirs", "mine"]